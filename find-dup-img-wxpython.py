@@ -1,19 +1,21 @@
 '''wxPython GUI for finding duplicate images'''
 
 import argparse
+import os
 import sys
-import platform
-import subprocess
 import wx.lib.newevent
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import wx
 import wx.lib.scrolledpanel as scrolled
 
-from utils.files import scan, sort_path_naturally, safe_remove, IMAGE_FILE_SUFFIXES
-from utils.images import HashableImage, HashComputer, create_thumb, get_image_info
+from utils.files import scan, sort_path_naturally, safe_remove, open_file_location, IMAGE_FILE_SUFFIXES
+from utils.images import HashableImage, HashComputer, open_info_thumb_hash
 from utils.image_compare import ImageComparisonObject, mark_groups, sort_images
 from utils.image_object import ImageObject
 from utils.safe_counter import SafeCounter
+from utils.thumb_cache import ThumbCache
 from utils.helpers import size_to_str
 
 # Delay constants (in milliseconds)
@@ -23,6 +25,9 @@ WINDOW_CLOSE_DELAY = 500  # 0.5 seconds
 # Custom event for image deletion
 ImageDeleteEvent, IMAGE_EVT_DELETE = wx.lib.newevent.NewEvent()
 
+# Which properties differ within a group (drives the red highlight)
+PropDiffs = namedtuple('PropDiffs', 'resolution size')
+
 class ImageDisplayPanel(wx.Panel):
     ''' Entry / item for displaying the image and details '''
     def __init__(self, parent, image_object, image, property_diffs=None):
@@ -35,9 +40,8 @@ class ImageDisplayPanel(wx.Panel):
         # Main sizer
         sizer = wx.BoxSizer(wx.HORIZONTAL)
         
-        # Image section (left)
-        bitmap = wx.Bitmap.FromBuffer(image.width, image.height, image.tobytes())
-        static_bitmap = wx.StaticBitmap(self, wx.ID_ANY, bitmap)
+        # Image section (left); image arrives as a ready-made wx.Bitmap
+        static_bitmap = wx.StaticBitmap(self, wx.ID_ANY, image)
         static_bitmap.SetMinSize((200, -1))  # Fixed width of 200px
         sizer.Add(static_bitmap, 0, wx.ALL, 5)
         
@@ -49,7 +53,7 @@ class ImageDisplayPanel(wx.Panel):
         path_text.SetForegroundColour(wx.Colour(0, 0, 255))  # Blue color
         path_text.SetFont(path_text.GetFont().Underlined())  # Underlined
         path_text.Wrap(180)  # Wrap slightly less than panel width
-        path_text.Bind(wx.EVT_LEFT_DOWN, lambda event: self.open_file_location(image_object.file_path))
+        path_text.Bind(wx.EVT_LEFT_DOWN, lambda event: open_file_location(image_object.file_path))
         path_text.SetCursor(wx.Cursor(wx.CURSOR_HAND))
         path_sizer.Add(path_text, 1, wx.EXPAND|wx.ALL, 5)
         path_panel.SetSizer(path_sizer)
@@ -58,14 +62,14 @@ class ImageDisplayPanel(wx.Panel):
         # Info section (right)
         info_sizer = wx.BoxSizer(wx.VERTICAL)
         info_labels = [
-            (f"{image_object.width}x{image_object.height}", 'resolution'),
-            (f"Size: {size_to_str(int(image_object.size))}", 'size')
+            (f"{image_object.width}x{image_object.height}", property_diffs.resolution if property_diffs else False),
+            (f"Size: {size_to_str(int(image_object.size))}", property_diffs.size if property_diffs else False)
         ]
         
-        for text, prop in info_labels:
+        for text, differs in info_labels:
             label = wx.StaticText(self, label=text)
             # Highlight in red if this property differs in the group
-            if property_diffs and property_diffs.get(prop, False):
+            if differs:
                 label.SetForegroundColour(wx.Colour(255, 0, 0))  # Red
             info_sizer.Add(label, 0, wx.ALL, 2)
         sizer.Add(info_sizer, 0, wx.ALL, 5)
@@ -89,19 +93,6 @@ class ImageDisplayPanel(wx.Panel):
         # Force layout update
         self.GetParent().Layout()
 
-    def open_file_location(self, file_path):
-        """Open file location in system file explorer and focus on file"""
-        file_path = Path(file_path)
-        try:
-            if platform.system() == 'Darwin':  # macOS
-                subprocess.run(['open', '-R', str(file_path)])
-            elif platform.system() == 'Windows':
-                subprocess.run(['explorer', '/select,', str(file_path)])
-            else:  # Linux and others
-                subprocess.run(['xdg-open', str(file_path.parent)])
-        except Exception as e:
-            print(f"Error opening file location: {e}")
-
 class GroupWindow(wx.Frame):
     ''' A window wrapper for a group of related images '''
     def __init__(self, group_num, image_paths, image_objects, image_thumbs, total_groups=None, fast_mode=False):
@@ -111,6 +102,9 @@ class GroupWindow(wx.Frame):
         if fast_mode:
             title += " (fast mode)"
         wx.Frame.__init__(self, None, title=title, size=(850, 800))
+
+        # Freeze repaints while the rows are built; one relayout at the end
+        self.Freeze()
         
         # Main sizer for entire window
         main_sizer = wx.BoxSizer(wx.VERTICAL)
@@ -166,6 +160,7 @@ class GroupWindow(wx.Frame):
         self.Bind(IMAGE_EVT_DELETE, self.on_image_deleted)
         
         self.SetSizer(main_sizer)
+        self.Thaw()
         wx.CallLater(WINDOW_OPEN_DELAY, self.Show)
         wx.CallLater(WINDOW_OPEN_DELAY + 100, self.Raise)  # Bring window to front
         self.SetFocus()  # Force focus
@@ -185,10 +180,10 @@ class GroupWindow(wx.Frame):
                 properties['size'].add(image.size)
         
         # Return which properties have differences
-        return {
-            'resolution': len(properties['resolution']) > 1,
-            'size': len(properties['size']) > 1
-        }
+        return PropDiffs(
+            resolution=len(properties['resolution']) > 1,
+            size=len(properties['size']) > 1
+        )
 
     def on_image_deleted(self, event):
         """Handle image deletion events"""
@@ -241,14 +236,15 @@ def main():
     # Image Hash related
     _computer = HashComputer('ahash')
     
-    for image_path in image_files:
-
-        _info = get_image_info(image_path)
+    def _process_one(image_path):
+        '''Read info, thumbnail and hash one image (run on a pool worker)'''
+        # One PIL open covers all three products
+        _info, _img_thumb, hashed_img = open_info_thumb_hash(image_path, _computer)
 
         if not _info:
             print(f"Error reading image: {image_path}")
-            continue
-        
+            return image_path, None, None, None
+
         # Create ImageObject
         image_obj = ImageObject(
             file_path=image_path,
@@ -256,29 +252,60 @@ def main():
             height=_info['height'],
             size=_info['file_size']
         )
-        image_objects[image_path] = image_obj
-        
-        # Create thumbnail
-        _img_thumb = create_thumb(image_path)
-        if _img_thumb:
-            image_thumbs[image_path] = [_img_thumb]
-        else:
+
+        if not _img_thumb:
             print(f"Error generate thumb for image {image_path}")
+        elif not hashed_img:
+            print(f"Error hashing image {image_path}")
+
+        return image_path, image_obj, _img_thumb, hashed_img
+
+    # On-disk cache: unchanged files reuse last run's info, thumb and hash
+    thumb_cache = ThumbCache()
+    to_process = []
+    for image_path in image_files:
+        hit = thumb_cache.get(image_path)
+        if hit is None:
+            to_process.append(image_path)
             continue
-        
-        # Create ImageComparisonObject with hashed image
-        hashed_img = None
-        try:
-            hashed_img = HashableImage.from_pil_image(image_path, _img_thumb, _computer)
-        except Exception as e:
-            print(f"Error hashing image {image_path}: {e}")
-            continue
-        
+        image_objects[image_path] = ImageObject(
+            file_path=image_path,
+            width=hit['width'],
+            height=hit['height'],
+            size=hit['size']
+        )
+        image_thumbs[image_path] = [hit['thumb']]
         image_comparison_objects[image_path] = ImageComparisonObject(
             file_path=image_path,
-            hashed_img=hashed_img
+            hashed_img=HashableImage.from_cached(image_path, hit['hash_int'])
         )
 
+    # PIL decode/resize and the hash kernels release the GIL, so a thread
+    # pool keeps every core busy without pickling any PIL objects
+    fresh_entries = []
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for image_path, image_obj, _img_thumb, hashed_img in executor.map(_process_one, to_process):
+            if image_obj is None:
+                continue
+            image_objects[image_path] = image_obj
+
+            if _img_thumb is None:
+                continue
+            image_thumbs[image_path] = [_img_thumb]
+
+            if hashed_img is None:
+                continue
+            image_comparison_objects[image_path] = ImageComparisonObject(
+                file_path=image_path,
+                hashed_img=hashed_img
+            )
+            fresh_entries.append(
+                (image_path, image_obj.width, image_obj.height, hashed_img.hash_int, _img_thumb))
+
+    # Remember the fresh results for the next run
+    thumb_cache.put_many(fresh_entries)
+    thumb_cache.close()
+
     # Process image comparisons
     counter = SafeCounter()
     image_comparison_list = list(image_comparison_objects.values())
@@ -305,21 +332,48 @@ def main():
     for group in grouped_images:
         grouped_images[group] = sort_path_naturally(grouped_images[group])
 
-    # Create wxPython app
+    # Create wxPython app once; closing a group window opens the next,
+    # so a single MainLoop serves the whole review session
     app = wx.App(False)
-    # Show each group in wxPython window
+
+    # Convert grouped thumbs to wx.Bitmap once; every panel reuses them.
+    # Grayscale thumbs get an RGB pass first (FromBuffer expects RGB bytes).
+    for image in sorted_images:
+        thumbs = image_thumbs.get(image.file_path)
+        if thumbs:
+            image_thumbs[image.file_path] = [
+                wx.Bitmap.FromBuffer(
+                    t.width, t.height,
+                    (t if t.mode == 'RGB' else t.convert('RGB')).tobytes())
+                for t in thumbs
+            ]
+
+    group_nums = [g for g in sorted(grouped_images.keys()) if grouped_images[g]]
     total_groups = len(grouped_images.keys())
-    for group_num in sorted(grouped_images.keys()):
-        if grouped_images[group_num]:
-            GroupWindow(
-                group_num,
-                grouped_images[group_num],
-                image_objects,
-                image_thumbs,
-                total_groups,
-                args.fast_mode
-            )
-            app.MainLoop()  # Process events until window closes
+
+    def show_group(index):
+        if index >= len(group_nums):
+            return  # last window closed, the main loop winds down
+        window = GroupWindow(
+            group_nums[index],
+            grouped_images[group_nums[index]],
+            image_objects,
+            image_thumbs,
+            total_groups,
+            args.fast_mode
+        )
+
+        def on_close(event):
+            # Open the next group before this window is destroyed, so the
+            # app always has a live top-level window until the last group
+            show_group(index + 1)
+            event.Skip()
+
+        window.Bind(wx.EVT_CLOSE, on_close)
+
+    if group_nums:
+        show_group(0)
+        app.MainLoop()
 
 if __name__ == '__main__':
     main()
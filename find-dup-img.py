@@ -1,14 +1,17 @@
 '''Command line tool for finding duplicate images'''
 
 import argparse
+import os
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from utils.files import scan, sort_path_naturally, IMAGE_FILE_SUFFIXES
-from utils.images import HashableImage, HashComputer, create_thumb, get_image_info
+from utils.images import HashableImage, HashComputer, open_info_thumb_hash
 from utils.image_compare import ImageComparisonObject, mark_groups, sort_images
 from utils.image_object import ImageObject
 from utils.safe_counter import SafeCounter
+from utils.thumb_cache import ThumbCache
 
 def format_size(size):
     '''Format file size with comma as thousand separator'''
@@ -58,13 +61,15 @@ def main():
     # Image Hash related
     _computer = HashComputer('ahash')
     
-    for image_path in image_files:
-        _info = get_image_info(image_path)
+    def _process_one(image_path):
+        '''Read info, thumbnail and hash one image (run on a pool worker)'''
+        # One PIL open covers all three products
+        _info, _img_thumb, hashed_img = open_info_thumb_hash(image_path, _computer)
 
         if not _info:
             print(f"Error reading image: {image_path}")
-            continue
-        
+            return image_path, None, None, None
+
         # Create ImageObject
         image_obj = ImageObject(
             file_path=image_path,
@@ -72,29 +77,60 @@ def main():
             height=_info['height'],
             size=_info['file_size']
         )
-        image_objects[image_path] = image_obj
-        
-        # Create thumbnail
-        _img_thumb = create_thumb(image_path)
-        if _img_thumb:
-            image_thumbs[image_path] = [_img_thumb]
-        else:
+
+        if not _img_thumb:
             print(f"Error generate thumb for image {image_path}")
+        elif not hashed_img:
+            print(f"Error hashing image {image_path}")
+
+        return image_path, image_obj, _img_thumb, hashed_img
+
+    # On-disk cache: unchanged files reuse last run's info, thumb and hash
+    thumb_cache = ThumbCache()
+    to_process = []
+    for image_path in image_files:
+        # The CLI never displays thumbnails, so skip their JPEG decode
+        hit = thumb_cache.get(image_path, decode_thumb=False)
+        if hit is None:
+            to_process.append(image_path)
             continue
-        
-        # Create ImageComparisonObject with hashed image
-        hashed_img = None
-        try:
-            hashed_img = HashableImage.from_pil_image(image_path, _img_thumb, _computer)
-        except Exception as e:
-            print(f"Error hashing image {image_path}: {e}")
-            continue
-        
+        image_objects[image_path] = ImageObject(
+            file_path=image_path,
+            width=hit['width'],
+            height=hit['height'],
+            size=hit['size']
+        )
         image_comparison_objects[image_path] = ImageComparisonObject(
             file_path=image_path,
-            hashed_img=hashed_img
+            hashed_img=HashableImage.from_cached(image_path, hit['hash_int'])
         )
 
+    # PIL decode/resize and the hash kernels release the GIL, so a thread
+    # pool keeps every core busy without pickling any PIL objects
+    fresh_entries = []
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for image_path, image_obj, _img_thumb, hashed_img in executor.map(_process_one, to_process):
+            if image_obj is None:
+                continue
+            image_objects[image_path] = image_obj
+
+            if _img_thumb is None:
+                continue
+            image_thumbs[image_path] = [_img_thumb]
+
+            if hashed_img is None:
+                continue
+            image_comparison_objects[image_path] = ImageComparisonObject(
+                file_path=image_path,
+                hashed_img=hashed_img
+            )
+            fresh_entries.append(
+                (image_path, image_obj.width, image_obj.height, hashed_img.hash_int, _img_thumb))
+
+    # Remember the fresh results for the next run
+    thumb_cache.put_many(fresh_entries)
+    thumb_cache.close()
+
     # Clean up thumbnails after processing
     del image_thumbs
 
@@ -122,32 +158,35 @@ def main():
     for group in grouped_images_dict:
         grouped_images_dict[group] = sort_path_naturally(grouped_images_dict[group])
 
-    # Prepare JSON output if requested
-    json_output = {}
-    
     print("\nDuplicate Groups:")
     for group_num in sorted(grouped_images_dict.keys()):
         group_files = grouped_images_dict[group_num]
         if group_files:
             print(f"\nGroup {group_num}:")
             
-            # Prepare group entry for JSON
-            json_group = []
-            
             for file_path in group_files:
                 img_obj = image_objects[file_path]
                 resolution = f"{img_obj.width}x{img_obj.height}"
                 size = format_size(img_obj.size)
                 print(f"  {file_path} ({resolution}, {size} bytes)")
-                json_group.append(str(file_path))
-            
-            json_output[group_num] = json_group
 
-    # Save to JSON file if requested
+    # Save to JSON file if requested, one group at a time so the whole
+    # serialized document never has to sit in memory
     if args.json:
         try:
             with open(args.json, 'w', encoding='utf-8') as f:
-                json.dump(json_output, f, indent=2, ensure_ascii=False)
+                f.write('{')
+                first = True
+                for group_num in sorted(grouped_images_dict.keys()):
+                    group_files = grouped_images_dict[group_num]
+                    if not group_files:
+                        continue
+                    if not first:
+                        f.write(',')
+                    f.write(f'\n  "{group_num}": ')
+                    json.dump([str(p) for p in group_files], f, indent=2, ensure_ascii=False)
+                    first = False
+                f.write('\n}')
             print(f"\nGroup information saved to: {args.json}")
         except Exception as e:
             print(f"Error saving JSON file: {e}")
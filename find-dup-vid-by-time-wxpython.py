@@ -1,20 +1,34 @@
 '''wxPython GUI for finding duplicate videos by duration only'''
 
 import argparse
+import os
 import sys
-import platform
-import subprocess
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from tempfile import TemporaryDirectory
 import wx
 import wx.lib.scrolledpanel as scrolled
 
-from utils.files import scan, sort_path_naturally, safe_remove
-from utils.ffprobe import get_video_info
-from utils.ffmpeg import screenshot
-from utils.helpers import seconds_to_str, size_to_str, generate_random_string
-from utils.images import create_thumb
+from utils.files import iter_scan, sort_path_naturally, safe_remove, open_file_location, quick_signature
+from utils.ffprobe import get_video_info_batch
+from utils.ffmpeg import screenshot_multi
+from utils.helpers import generate_random_string
+from utils.images import create_thumb, create_nil_thumb, stitch_thumbs
 from utils.video_object import VideoObject
+from utils.metadata_cache import MetadataCache
+
+# Width of the thumbnails shown in group windows (pixels)
+THUMBNAIL_WIDTH = 100
+
+# Shared "No Image" bitmap, converted from the cached placeholder once
+_nil_bitmaps = {}
+
+def nil_bitmap(dimension: int = 100) -> 'wx.Bitmap':
+    if dimension not in _nil_bitmaps:
+        img = create_nil_thumb(dimension)
+        _nil_bitmaps[dimension] = wx.Bitmap.FromBuffer(img.width, img.height, img.tobytes())
+    return _nil_bitmaps[dimension]
 
 class VideoDisplayPanel(wx.Panel):
     def __init__(self, parent, video_object, images):
@@ -26,10 +40,9 @@ class VideoDisplayPanel(wx.Panel):
         # Main sizer
         sizer = wx.BoxSizer(wx.HORIZONTAL)
         
-        # Images section (left)
+        # Images section (left); images arrive as ready-made wx.Bitmap
         img_sizer = wx.BoxSizer(wx.HORIZONTAL)
-        for img in images[:3]:
-            bitmap = wx.Bitmap.FromBuffer(img.width, img.height, img.tobytes())
+        for bitmap in images[:3]:
             static_bitmap = wx.StaticBitmap(self, wx.ID_ANY, bitmap)
             static_bitmap.SetMinSize((100, -1))  # Fixed width of 100px
             img_sizer.Add(static_bitmap, 0, wx.ALL, 5)
@@ -43,21 +56,15 @@ class VideoDisplayPanel(wx.Panel):
         path_text.SetForegroundColour(wx.Colour(0, 0, 255))  # Blue color
         path_text.SetFont(path_text.GetFont().Underlined())  # Underlined
         path_text.Wrap(180)  # Wrap slightly less than panel width
-        path_text.Bind(wx.EVT_LEFT_DOWN, lambda event: self.open_file_location(video_object.file_path))
+        path_text.Bind(wx.EVT_LEFT_DOWN, lambda event: open_file_location(video_object.file_path))
         path_text.SetCursor(wx.Cursor(wx.CURSOR_HAND))
         path_sizer.Add(path_text, 1, wx.EXPAND|wx.ALL, 5)
         path_panel.SetSizer(path_sizer)
         sizer.Add(path_panel, 1, wx.EXPAND|wx.ALL, 5)
         
-        # Info section (right)
+        # Info section (right); label strings are cached on the VideoObject
         info_sizer = wx.BoxSizer(wx.VERTICAL)
-        info_labels = [
-            f"{video_object.width}x{video_object.height}",
-            f"Duration: {seconds_to_str(video_object.duration)}",
-            f"Size: {size_to_str(video_object.size)}",
-            f"FPS: {video_object.fps}",
-            f"Codec: {video_object.codec}"
-        ]
+        info_labels = video_object.display_labels
         for text in info_labels:
             label = wx.StaticText(self, label=text)
             info_sizer.Add(label, 0, wx.ALL, 2)
@@ -74,23 +81,13 @@ class VideoDisplayPanel(wx.Panel):
         safe_remove(self.video_object.file_path)
         event.GetEventObject().Disable()
 
-    def open_file_location(self, file_path):
-        """Open file location in system file explorer and focus on file"""
-        file_path = Path(file_path)
-        try:
-            if platform.system() == 'Darwin':  # macOS
-                subprocess.run(['open', '-R', str(file_path)])
-            elif platform.system() == 'Windows':
-                subprocess.run(['explorer', '/select,', str(file_path)])
-            else:  # Linux and others
-                subprocess.run(['xdg-open', str(file_path.parent)])
-        except Exception as e:
-            print(f"Error opening file location: {e}")
-
 class GroupWindow(wx.Frame):
     def __init__(self, group_num, video_paths, video_objects, video_thumbs, total_groups=None):
         wx.Frame.__init__(self, None, title=f"Group {group_num}",
                          size=(850, 800))
+
+        # Freeze repaints while the rows are built; one relayout at the end
+        self.Freeze()
         
         # Main sizer for entire window
         main_sizer = wx.BoxSizer(wx.VERTICAL)
@@ -113,13 +110,14 @@ class GroupWindow(wx.Frame):
         
         # Add video panels
         for video_path in video_paths:
-            if video_path in video_thumbs and video_thumbs[video_path]:
-                video_panel = VideoDisplayPanel(
-                    scroll_panel,
-                    video_objects[video_path],
-                    video_thumbs[video_path]
-                )
-                scroll_sizer.Add(video_panel, 0, wx.EXPAND|wx.ALL, 5)
+            # Fall back to the shared placeholder thumb when screenshots failed
+            images = video_thumbs.get(video_path) or [nil_bitmap()]
+            video_panel = VideoDisplayPanel(
+                scroll_panel,
+                video_objects[video_path],
+                images
+            )
+            scroll_sizer.Add(video_panel, 0, wx.EXPAND|wx.ALL, 5)
         
         scroll_panel.SetSizer(scroll_sizer)
         main_sizer.Add(scroll_panel, 1, wx.EXPAND)
@@ -137,41 +135,85 @@ class GroupWindow(wx.Frame):
         main_sizer.Add(bottom_panel, 0, wx.EXPAND)
         
         self.SetSizer(main_sizer)
+        self.Thaw()
         self.Show()
         self.Raise()  # Bring window to front
         self.SetFocus()  # Force focus
         self.RequestUserAttention()  # Ensure window gets attention
 
 def group_videos_by_duration(video_objects):
-    """Group videos by duration, return dict of {duration: [video_paths]}"""
-    duration_groups = {}
-    
-    # Sort videos by duration (longest first)
-    sorted_videos = sorted(
-        video_objects.items(),
-        key=lambda x: x[1].duration,
+    """Group videos by duration, return dict of {group_number: [video_paths]}"""
+    # Bucket in a single pass; no need to sort all videos up front
+    buckets = defaultdict(list)
+    for video_path, video_obj in video_objects.items():
+        buckets[video_obj.duration].append(video_path)
+
+    # Keep only durations shared by more than one video,
+    # numbering groups from longest duration to shortest
+    durations = sorted(
+        (duration for duration, paths in buckets.items() if len(paths) > 1),
         reverse=True
     )
-    
-    for video_path, video_obj in sorted_videos:
-        duration = video_obj.duration
-        if duration not in duration_groups:
-            duration_groups[duration] = []
-        duration_groups[duration].append(video_path)
-    
-    # Filter out groups with only one video
-    filtered_groups = {
-        duration: paths 
-        for duration, paths in duration_groups.items() 
-        if len(paths) > 1
-    }
-    
+
     # Convert to group_number: paths format to match original structure
     return {
-        i+1: sort_path_naturally(paths)
-        for i, (duration, paths) in enumerate(filtered_groups.items())
+        i+1: sort_path_naturally(buckets[duration])
+        for i, duration in enumerate(durations)
     }
 
+def generate_group_thumbs(video_paths, video_objects, video_thumbs, temp_dir):
+    """Take screenshots and build thumbnails for one group's videos, once"""
+    jobs = []  # (video_path, timestamps, output_pattern)
+    for video_path in video_paths:
+        if video_path in video_thumbs:
+            continue  # already generated for an earlier group
+        video_thumbs[video_path] = []
+
+        # Generate unique random string for this video
+        rand_str = generate_random_string()
+        duration = video_objects[video_path].duration
+
+        # Screenshots at key timestamps, if the video is long enough
+        timestamps = [sec for sec in (5, 60, 120) if sec <= duration]
+        if not timestamps:
+            continue
+        output_pattern = str(Path(temp_dir.name) / f"{video_path.stem.replace('%', '%%')}_{rand_str}_%d.jpg")
+        jobs.append((video_path, timestamps, output_pattern))
+
+    # One ffmpeg invocation per video grabs all of its frames; the pool
+    # overlaps the subprocess waits across videos.
+    shots = {}
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {
+            executor.submit(screenshot_multi, str(p), pattern, secs, THUMBNAIL_WIDTH): p
+            for p, secs, pattern in jobs
+        }
+        for future in as_completed(futures):
+            video_path = futures[future]
+            try:
+                shots[video_path] = future.result()
+            except Exception as e:
+                print(f"Error taking screenshots of {video_path}: {e}")
+
+    # Thumbnails, in timestamp order per video
+    for video_path, secs, pattern in jobs:
+        thumbs = []
+        for screenshot_path in shots.get(video_path, []):
+            if not screenshot_path.exists():
+                continue
+
+            _img_obj = create_thumb(screenshot_path, THUMBNAIL_WIDTH)
+            if _img_obj:
+                thumbs.append(_img_obj)
+
+            video_objects[video_path].screenshots.append(screenshot_path)
+
+        # One composite strip per row: a single bitmap and paint call
+        strip = stitch_thumbs(thumbs)
+        if strip:
+            video_thumbs[video_path].append(
+                wx.Bitmap.FromBuffer(strip.width, strip.height, strip.tobytes()))
+
 def main():
     parser = argparse.ArgumentParser(description='Scan for video files by duration')
     parser.add_argument('folder_path', type=str, help='Path to scan for video files')
@@ -192,17 +234,11 @@ def main():
         print(f"Error: Path does not exist: {args.folder_path}")
         sys.exit(1)
 
-    # Look for videos
     # Convert comma-separated ignore names to list
     ignore_names = [name.strip() for name in args.ignore_partial_names.split(',')] if args.ignore_partial_names else []
-    
-    video_files = scan(
-        folder_path=args.folder_path,
-        ignore_hidden=args.ignore_hidden,
-        ignore_readonly_folder=args.ignore_readonly_folder,
-        recursive=args.recursive,
-        ignore_partial_names=ignore_names
-    )
+
+    # Create wxPython app up front: wx.Bitmap conversion below needs it
+    app = wx.App(False)
 
     # Create a temp dir to host screenshots of videos
     temp_dir = TemporaryDirectory()
@@ -211,67 +247,119 @@ def main():
     video_objects = {}
     video_thumbs = {}
 
-    try:
-        for video_path in video_files:
-            # Generate unique random string for this video
-            rand_str = generate_random_string()
-            
-            # Get video info
-            width, height, duration, size, fps, codec = get_video_info(str(video_path))
-            duration = int(duration)
-            
-            # Create VideoObject
-            video_obj = VideoObject(
-                file_path=video_path,
-                screenshots=[],
-                width=width,
-                height=height,
-                duration=duration,
-                size=size,
-                fps=fps,
-                codec=codec
-            )
-            
-            # Take screenshots at key timestamps
-            timestamps = [5, 60, 120]
-            for sec in timestamps:
-                if sec <= duration:  # Only if video is long enough
-                    timestamp_str = seconds_to_str(sec)
-                    screenshot_path = Path(temp_dir.name) / f"{video_path.stem}_{rand_str}_{sec}s.jpg"
-                    screenshot(str(video_path), str(screenshot_path), timestamp_str)
-                    
-                    _img_obj = create_thumb(screenshot_path)
-                    if not video_thumbs.get(video_path, None):
-                        video_thumbs[video_path] = []
-                    if _img_obj:
-                        video_thumbs[video_path].append(_img_obj)
-
-                    video_obj.screenshots.append(screenshot_path)
-            
-            video_objects[video_path] = video_obj
+    # Byte-identical prefilter: bucket files by size, then by a cheap
+    # head+tail signature, so exact copies share one ffprobe result
+    size_buckets = defaultdict(list)
+    for video_path in iter_scan(
+            folder_path=args.folder_path,
+            ignore_hidden=args.ignore_hidden,
+            ignore_readonly_folder=args.ignore_readonly_folder,
+            recursive=args.recursive,
+            ignore_partial_names=ignore_names):
+        try:
+            size_buckets[video_path.stat().st_size].append(video_path)
+        except OSError:
+            continue
 
-    finally:
-        temp_dir.cleanup()
+    representative = {}  # video_path -> path whose bytes look identical
+    for paths in size_buckets.values():
+        if len(paths) == 1:
+            representative[paths[0]] = paths[0]
+            continue
+        by_sig = {}
+        for video_path in paths:
+            sig = quick_signature(video_path)
+            if sig is not None and sig in by_sig:
+                representative[video_path] = by_sig[sig]
+            else:
+                if sig is not None:
+                    by_sig[sig] = video_path
+                representative[video_path] = video_path
 
-    # Group videos by duration
-    grouped_videos = group_videos_by_duration(video_objects)
+    # Probe each representative once, preferring the on-disk cache
+    metadata_cache = MetadataCache()
+    rep_infos = {}
+    to_probe = []
+    for video_path in set(representative.values()):
+        info = metadata_cache.get(video_path)
+        if info is not None:
+            rep_infos[video_path] = info
+        else:
+            to_probe.append(video_path)
 
-    print(f"\nTotal Groups: {len(grouped_videos.keys())}")
+    probed, probe_errors = get_video_info_batch(to_probe)
+    rep_infos.update(probed)
+    for video_path, e in probe_errors.items():
+        print(f"Error probing video {video_path}: {e}")
 
-    # Create wxPython app
-    app = wx.App(False)
-    # Show each group in wxPython window
-    total_groups = len(grouped_videos.keys())
-    for group_num in sorted(grouped_videos.keys()):
-        if grouped_videos[group_num]:
-            GroupWindow(
+    # Remember the fresh results for the next run
+    metadata_cache.put_many(probed.items())
+    metadata_cache.close()
+
+    # Copies inherit their representative's metadata (same size and bytes)
+    video_infos = {}
+    for video_path, rep in representative.items():
+        if rep in rep_infos:
+            video_infos[video_path] = rep_infos[rep]
+
+    # Build VideoObjects; screenshots are deferred until a group opens
+    for video_path, info in video_infos.items():
+        width, height, duration, size, fps, codec = info
+        duration = int(duration)
+
+        video_objects[video_path] = VideoObject(
+            file_path=video_path,
+            screenshots=[],
+            width=width,
+            height=height,
+            duration=duration,
+            size=size,
+            fps=fps,
+            codec=codec
+        )
+
+    try:
+        # Group videos by duration
+        grouped_videos = group_videos_by_duration(video_objects)
+
+        print(f"\nTotal Groups: {len(grouped_videos.keys())}")
+
+        # Show each group in a wxPython window, one MainLoop for the whole
+        # session: closing a group opens the next, and screenshots are only
+        # taken for the groups actually opened, not for every scanned video.
+        group_nums = [g for g in sorted(grouped_videos.keys()) if grouped_videos[g]]
+        total_groups = len(grouped_videos.keys())
+
+        def show_group(index):
+            if index >= len(group_nums):
+                return  # last window closed, the main loop winds down
+            group_num = group_nums[index]
+            generate_group_thumbs(grouped_videos[group_num], video_objects, video_thumbs, temp_dir)
+            window = GroupWindow(
                 group_num,
                 grouped_videos[group_num],
                 video_objects,
                 video_thumbs,
                 total_groups
             )
-            app.MainLoop()  # Process events until window closes
+
+            def on_close(event):
+                # Release this group's bitmaps and open the next window
+                # before this one is destroyed, so the app always has a
+                # live top-level window until the last group
+                for video_path in grouped_videos[group_num]:
+                    video_thumbs.pop(video_path, None)
+                show_group(index + 1)
+                event.Skip()
+
+            window.Bind(wx.EVT_CLOSE, on_close)
+
+        if group_nums:
+            show_group(0)
+            app.MainLoop()
+
+    finally:
+        temp_dir.cleanup()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,23 +1,38 @@
 '''wxPython GUI for finding duplicate videos'''
 
 import argparse
+import os
 import sys
-import platform
-import subprocess
 import wx.lib.newevent
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from tempfile import TemporaryDirectory
 import wx
 import wx.lib.scrolledpanel as scrolled
 
-from utils.files import scan, sort_path_naturally, safe_remove
-from utils.ffprobe import get_video_info
-from utils.ffmpeg import screenshot
-from utils.helpers import seconds_to_str, size_to_str, generate_random_string
-from utils.images import HashableImage, HashComputer, create_thumb
+from utils.files import iter_scan, sort_path_naturally, safe_remove, open_file_location, quick_signature
+from utils.ffprobe import get_video_info_batch
+from utils.ffmpeg import screenshot_multi
+from utils.helpers import generate_random_string
+from utils.images import HashableImage, HashComputer, create_thumb, create_nil_thumb, stitch_thumbs
 from utils.video_compare import VideoComparisonObject, mark_groups, sort_videos
 from utils.video_object import VideoObject
 from utils.safe_counter import SafeCounter
+from utils.metadata_cache import MetadataCache
+
+# Screenshots leave ffmpeg at this width: plenty for the 100 px display
+# thumbs and the 8x8 hash, at a fraction of a full frame's decode cost
+SCREENSHOT_WIDTH = 200
+
+# Shared "No Image" bitmap, converted from the cached placeholder once
+_nil_bitmaps = {}
+
+def nil_bitmap(dimension: int = 100) -> 'wx.Bitmap':
+    if dimension not in _nil_bitmaps:
+        img = create_nil_thumb(dimension)
+        _nil_bitmaps[dimension] = wx.Bitmap.FromBuffer(img.width, img.height, img.tobytes())
+    return _nil_bitmaps[dimension]
 
 # Custom event for video deletion
 VideoDeleteEvent, VIDEO_EVT_DELETE = wx.lib.newevent.NewEvent()
@@ -33,10 +48,9 @@ class VideoDisplayPanel(wx.Panel):
         # Main sizer
         sizer = wx.BoxSizer(wx.HORIZONTAL)
         
-        # Images section (left)
+        # Images section (left); images arrive as ready-made wx.Bitmap
         img_sizer = wx.BoxSizer(wx.HORIZONTAL)
-        for img in images[:3]:
-            bitmap = wx.Bitmap.FromBuffer(img.width, img.height, img.tobytes())
+        for bitmap in images[:3]:
             static_bitmap = wx.StaticBitmap(self, wx.ID_ANY, bitmap)
             static_bitmap.SetMinSize((100, -1))  # Fixed width of 100px
             img_sizer.Add(static_bitmap, 0, wx.ALL, 5)
@@ -50,21 +64,18 @@ class VideoDisplayPanel(wx.Panel):
         path_text.SetForegroundColour(wx.Colour(0, 0, 255))  # Blue color
         path_text.SetFont(path_text.GetFont().Underlined())  # Underlined
         path_text.Wrap(180)  # Wrap slightly less than panel width
-        path_text.Bind(wx.EVT_LEFT_DOWN, lambda event: self.open_file_location(video_object.file_path))
+        path_text.Bind(wx.EVT_LEFT_DOWN, lambda event: open_file_location(video_object.file_path))
         path_text.SetCursor(wx.Cursor(wx.CURSOR_HAND))
         path_sizer.Add(path_text, 1, wx.EXPAND|wx.ALL, 5)
         path_panel.SetSizer(path_sizer)
         sizer.Add(path_panel, 1, wx.EXPAND|wx.ALL, 5)
         
-        # Info section (right)
+        # Info section (right); label strings are cached on the VideoObject
         info_sizer = wx.BoxSizer(wx.VERTICAL)
-        info_labels = [
-            (f"{video_object.width}x{video_object.height}", 'resolution'),
-            (f"Duration: {seconds_to_str(video_object.duration)}", 'duration'),
-            (f"Size: {size_to_str(video_object.size)}", 'size'),
-            (f"FPS: {video_object.fps}", 'fps'),
-            (f"Codec: {video_object.codec}", 'codec')
-        ]
+        info_labels = list(zip(
+            video_object.display_labels,
+            ('resolution', 'duration', 'size', 'fps', 'codec')
+        ))
         
         for text, prop in info_labels:
             label = wx.StaticText(self, label=text)
@@ -89,28 +100,18 @@ class VideoDisplayPanel(wx.Panel):
         delete_event = VideoDeleteEvent()
         wx.PostEvent(self.GetParent().GetParent(), delete_event)
 
-    def open_file_location(self, file_path):
-        """Open file location in system file explorer and focus on file"""
-        file_path = Path(file_path)
-        try:
-            if platform.system() == 'Darwin':  # macOS
-                subprocess.run(['open', '-R', str(file_path)])
-            elif platform.system() == 'Windows':
-                subprocess.run(['explorer', '/select,', str(file_path)])
-            else:  # Linux and others
-                subprocess.run(['xdg-open', str(file_path.parent)])
-        except Exception as e:
-            print(f"Error opening file location: {e}")
-
 class GroupWindow(wx.Frame):
     ''' A window wrapper for a group of related videos '''
-    def __init__(self, group_num, video_paths, video_objects, video_thumbs, total_groups=None, fast_mode=False):
-        # Analyze property differences in the group
-        self.property_diffs = self._analyze_property_differences(video_paths, video_objects)
+    def __init__(self, group_num, video_paths, video_objects, video_thumbs, total_groups=None, fast_mode=False, property_diffs=None):
+        # Property differences are analyzed once in main(), not per window
+        self.property_diffs = property_diffs
         title = f"Group {group_num}"
         if fast_mode:
             title += " (fast mode)"
         wx.Frame.__init__(self, None, title=title, size=(850, 800))
+
+        # Freeze repaints while the rows are built; one relayout at the end
+        self.Freeze()
         
         # Main sizer for entire window
         main_sizer = wx.BoxSizer(wx.VERTICAL)
@@ -126,24 +127,14 @@ class GroupWindow(wx.Frame):
         top_panel.SetSizer(top_sizer)
         main_sizer.Add(top_panel, 0, wx.EXPAND|wx.TOP|wx.BOTTOM, 10)
         
-        # Middle scrolled panel for video content
+        # Middle scrolled panel for video content; rows stream in after Show
         scroll_panel = scrolled.ScrolledPanel(self)
         scroll_panel.SetupScrolling()
         scroll_sizer = wx.BoxSizer(wx.VERTICAL)
-        
-        # Add video panels
-        for video_path in video_paths:
-            if video_path in video_thumbs and video_thumbs[video_path]:
-                video_panel = VideoDisplayPanel(
-                    scroll_panel,
-                    video_objects[video_path],
-                    video_thumbs[video_path],
-                    self.property_diffs
-                )
-                scroll_sizer.Add(video_panel, 0, wx.EXPAND|wx.ALL, 5)
-        
         scroll_panel.SetSizer(scroll_sizer)
         main_sizer.Add(scroll_panel, 1, wx.EXPAND)
+        self._scroll_panel = scroll_panel
+        self._scroll_sizer = scroll_sizer
         
         # Bottom panel with group info
         bottom_panel = wx.Panel(self)
@@ -166,13 +157,49 @@ class GroupWindow(wx.Frame):
         self.Bind(VIDEO_EVT_DELETE, self.on_video_deleted)
         
         self.SetSizer(main_sizer)
+        self.Thaw()
         self.Show()
         self.Raise()  # Bring window to front
         self.SetFocus()  # Force focus
         self.RequestUserAttention()  # Ensure window gets attention
+
+        # Stream the rows in after the frame is visible, a few at a time,
+        # so large groups paint immediately instead of after N panel builds
+        wx.CallAfter(self._populate, video_paths, video_objects, video_thumbs)
     
-    def _analyze_property_differences(self, video_paths, video_objects):
-        """Analyze video properties to find differences within the group"""
+    _POPULATE_BATCH = 5
+
+    def _populate(self, video_paths, video_objects, video_thumbs, start=0):
+        """Add a batch of video panels, then yield back to the event loop"""
+        if not self:
+            return  # window was closed mid-population
+        for video_path in video_paths[start:start + self._POPULATE_BATCH]:
+            # Fall back to the shared placeholder thumb when screenshots failed
+            images = video_thumbs.get(video_path) or [nil_bitmap()]
+            video_panel = VideoDisplayPanel(
+                self._scroll_panel,
+                video_objects[video_path],
+                images,
+                self.property_diffs
+            )
+            self._scroll_sizer.Add(video_panel, 0, wx.EXPAND|wx.ALL, 5)
+
+        self._scroll_panel.Layout()
+        self._scroll_panel.SetupScrolling(scrollToTop=False)
+        if start + self._POPULATE_BATCH < len(video_paths):
+            wx.CallAfter(self._populate, video_paths, video_objects, video_thumbs,
+                         start + self._POPULATE_BATCH)
+
+    def on_video_deleted(self, event):
+        """Handle video deletion events"""
+        self.deleted_count += 1
+        if self.fast_mode and abs(self.total_videos - self.deleted_count) <= 1:
+            self.Close()
+
+def compute_all_diffs(grouped_videos, video_objects):
+    """Per-group property-difference flags, computed once for all groups"""
+    all_diffs = {}
+    for group_num, video_paths in grouped_videos.items():
         properties = {
             'resolution': set(),
             'duration': set(),
@@ -180,30 +207,76 @@ class GroupWindow(wx.Frame):
             'fps': set(),
             'codec': set()
         }
-        
+
         for path in video_paths:
             if path in video_objects:
                 video = video_objects[path]
-                properties['resolution'].add(f"{video.width}x{video.height}")
+                properties['resolution'].add(video.display_labels[0])
                 properties['duration'].add(video.duration)
                 properties['size'].add(video.size)
                 properties['fps'].add(video.fps)
                 properties['codec'].add(video.codec)
-        
-        # Return which properties have differences
-        return {
+
+        all_diffs[group_num] = {
             'resolution': len(properties['resolution']) > 1,
             'duration': len(properties['duration']) > 1,
             'size': len(properties['size']) > 1,
             'fps': len(properties['fps']) > 1,
             'codec': len(properties['codec']) > 1
         }
+    return all_diffs
 
-    def on_video_deleted(self, event):
-        """Handle video deletion events"""
-        self.deleted_count += 1
-        if self.fast_mode and abs(self.total_videos - self.deleted_count) <= 1:
-            self.Close()
+def generate_group_thumbs(video_paths, video_objects, video_thumbs, temp_dir):
+    """Build thumbnails for one group's videos, shooting any missing frames first"""
+    # Videos that skipped ffmpeg earlier (cached hashes) get frames now
+    jobs = []  # (video_path, timestamps, output_pattern)
+    for video_path in video_paths:
+        if video_path in video_thumbs:
+            continue
+        video_obj = video_objects[video_path]
+        if video_obj.screenshots:
+            continue
+        timestamps = [sec for sec in (5, 60, 120) if sec <= video_obj.duration]
+        if not timestamps:
+            continue
+        rand_str = generate_random_string()
+        output_pattern = str(Path(temp_dir.name) / f"{video_path.stem.replace('%', '%%')}_{rand_str}_%d.jpg")
+        jobs.append((video_path, timestamps, output_pattern))
+
+    if jobs:
+        shots = {}
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {
+                executor.submit(screenshot_multi, str(p), pattern, secs, SCREENSHOT_WIDTH): p
+                for p, secs, pattern in jobs
+            }
+            for future in as_completed(futures):
+                video_path = futures[future]
+                try:
+                    shots[video_path] = future.result()
+                except Exception as e:
+                    print(f"Error taking screenshots of {video_path}: {e}")
+        for video_path, secs, pattern in jobs:
+            for screenshot_path in shots.get(video_path, []):
+                if screenshot_path.exists():
+                    video_objects[video_path].screenshots.append(screenshot_path)
+
+    for video_path in video_paths:
+        if video_path in video_thumbs:
+            continue  # already built for an earlier group
+        video_thumbs[video_path] = []
+
+        thumbs = []
+        for screenshot_path in video_objects[video_path].screenshots:
+            _img_obj = create_thumb(screenshot_path)
+            if _img_obj:
+                thumbs.append(_img_obj)
+
+        # One composite strip per row: a single bitmap and paint call
+        strip = stitch_thumbs(thumbs)
+        if strip:
+            video_thumbs[video_path].append(
+                wx.Bitmap.FromBuffer(strip.width, strip.height, strip.tobytes()))
 
 def main():
     parser = argparse.ArgumentParser(description='Scan for video files')
@@ -227,17 +300,11 @@ def main():
         print(f"Error: Path does not exist: {args.folder_path}")
         sys.exit(1)
 
-    # Look for videos
     # Convert comma-separated ignore names to list
     ignore_names = [name.strip() for name in args.ignore_partial_names.split(',')] if args.ignore_partial_names else []
-    
-    video_files = scan(
-        folder_path=args.folder_path,
-        ignore_hidden=args.ignore_hidden,
-        ignore_readonly_folder=args.ignore_readonly_folder,
-        recursive=args.recursive,
-        ignore_partial_names=ignore_names
-    )
+
+    # Create wxPython app up front: wx.Bitmap conversion below needs it
+    app = wx.App(False)
 
     # Create a temp dir to host screenshots of videos
     temp_dir = TemporaryDirectory()
@@ -249,15 +316,76 @@ def main():
 
     # Image Hash related
     _computer = HashComputer('ahash')
+
+    # Byte-identical prefilter: bucket files by size, then by a cheap
+    # head+tail signature; exact copies share one probe/screenshot/hash
+    size_buckets = defaultdict(list)
+    for video_path in iter_scan(
+            folder_path=args.folder_path,
+            ignore_hidden=args.ignore_hidden,
+            ignore_readonly_folder=args.ignore_readonly_folder,
+            recursive=args.recursive,
+            ignore_partial_names=ignore_names):
+        try:
+            size_buckets[video_path.stat().st_size].append(video_path)
+        except OSError:
+            continue
+
+    representative = {}  # video_path -> path whose bytes look identical
+    for paths in size_buckets.values():
+        if len(paths) == 1:
+            representative[paths[0]] = paths[0]
+            continue
+        by_sig = {}
+        for video_path in paths:
+            sig = quick_signature(video_path)
+            if sig is not None and sig in by_sig:
+                representative[video_path] = by_sig[sig]
+            else:
+                if sig is not None:
+                    by_sig[sig] = video_path
+                representative[video_path] = video_path
+
+    # Probe each representative once, preferring the on-disk cache
+    metadata_cache = MetadataCache()
+    rep_infos = {}
+    to_probe = []
+    for video_path in set(representative.values()):
+        info = metadata_cache.get(video_path)
+        if info is not None:
+            rep_infos[video_path] = info
+        else:
+            to_probe.append(video_path)
+
+    probed, probe_errors = get_video_info_batch(to_probe)
+    rep_infos.update(probed)
+    for video_path, e in probe_errors.items():
+        print(f"Error probing video {video_path}: {e}")
+
+    # Remember the fresh results for the next run
+    metadata_cache.put_many(probed.items())
+
+    # Copies inherit their representative's metadata (same size and bytes)
+    video_infos = {}
+    for video_path, rep in representative.items():
+        if rep in rep_infos:
+            video_infos[video_path] = rep_infos[rep]
+
     try:
-        for video_path in video_files:
+        # Build VideoObjects and the per-video screenshot jobs. Hashes come
+        # from the cache where valid, so those videos skip ffmpeg here and
+        # only get frames if one of their groups is opened later.
+        rep_hashed = {}
+        cached_rep_paths = set()
+        screenshot_jobs = []  # (video_path, timestamps, output_pattern)
+        for video_path, info in video_infos.items():
             # Generate unique random string for this video
             rand_str = generate_random_string()
-            
+
             # Get video info
-            width, height, duration, size, fps, codec = get_video_info(str(video_path))
+            width, height, duration, size, fps, codec = info
             duration = int(duration)
-            
+
             # Create VideoObject
             video_obj = VideoObject(
                 file_path=video_path,
@@ -269,81 +397,153 @@ def main():
                 fps=fps,
                 codec=codec
             )
-            
-            # Take screenshots at key timestamps
-            timestamps = [5, 60, 120]
-            for sec in timestamps:
-                if sec <= duration:  # Only if video is long enough
-                    timestamp_str = seconds_to_str(sec)
-                    screenshot_path = Path(temp_dir.name) / f"{video_path.stem}_{rand_str}_{sec}s.jpg"
-                    screenshot(str(video_path), str(screenshot_path), timestamp_str)
-                    
-                    _img_obj = create_thumb(screenshot_path)
-                    if not video_thumbs.get(video_path, None):
-                        video_thumbs[video_path] = []
-                    if _img_obj:
-                        video_thumbs[video_path].append(_img_obj)
-
-                    video_obj.screenshots.append(screenshot_path)
-            
             video_objects[video_path] = video_obj
-            
-            # Create VideoComparisonObject with hashed screenshots
-            hashed_imgs = []
-            for screenshot_path in video_obj.screenshots:
+
+            # Screenshots at key timestamps, if the video is long enough.
+            # Only representatives are shot; copies share the frames below.
+            if representative.get(video_path, video_path) != video_path:
+                continue
+            cached = metadata_cache.get_hashes(video_path)
+            if cached is not None:
+                rep_hashed[video_path] = [
+                    HashableImage.from_cached(video_path, h) for h in cached]
+                cached_rep_paths.add(video_path)
+                continue
+            timestamps = [sec for sec in (5, 60, 120) if sec <= duration]
+            if timestamps:
+                output_pattern = str(Path(temp_dir.name) / f"{video_path.stem.replace('%', '%%')}_{rand_str}_%d.jpg")
+                screenshot_jobs.append((video_path, timestamps, output_pattern))
+
+        # One ffmpeg invocation per video grabs all of its frames; the pool
+        # overlaps the subprocess waits across videos.
+        shots = {}
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {
+                executor.submit(screenshot_multi, str(p), pattern, secs, SCREENSHOT_WIDTH): p
+                for p, secs, pattern in screenshot_jobs
+            }
+            for future in as_completed(futures):
+                video_path = futures[future]
                 try:
-                    hashed_img = HashableImage(Path(screenshot_path), _computer)
-                    hashed_imgs.append(hashed_img)
+                    shots[video_path] = future.result()
                 except Exception as e:
-                    print(f"Error processing screenshot {screenshot_path}: {e}")
-            
+                    print(f"Error taking screenshots of {video_path}: {e}")
+
+        # Record the frames that made it, in timestamp order per video.
+        # Thumbnails are built lazily when a group window opens.
+        for video_path, secs, pattern in screenshot_jobs:
+            for screenshot_path in shots.get(video_path, []):
+                if screenshot_path.exists():
+                    video_objects[video_path].screenshots.append(screenshot_path)
+
+        # Byte-identical copies share their representative's screenshots
+        for video_path, rep in representative.items():
+            if rep != video_path and video_path in video_objects and rep in video_objects:
+                video_objects[video_path].screenshots = video_objects[rep].screenshots
+
+        # Hash every fresh representative's screenshots on one pool (PIL
+        # decode and the hash kernels release the GIL); map() keeps order
+        def _hash_one(screenshot_path):
+            try:
+                return HashableImage(Path(screenshot_path), _computer)
+            except Exception as e:
+                print(f"Error processing screenshot {screenshot_path}: {e}")
+                return None
+
+        hash_jobs = []  # (video_path, screenshot_path)
+        for video_path, video_obj in video_objects.items():
+            if representative.get(video_path, video_path) != video_path:
+                continue
+            if video_path in rep_hashed:
+                continue  # hashes came from the cache
+            rep_hashed[video_path] = []
+            hash_jobs.extend((video_path, p) for p in video_obj.screenshots)
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for (video_path, _), hashed_img in zip(
+                    hash_jobs, executor.map(lambda job: _hash_one(job[1]), hash_jobs)):
+                if hashed_img:
+                    rep_hashed[video_path].append(hashed_img)
+
+        for video_path in video_objects:
+            rep = representative.get(video_path, video_path)
             video_comparison_objects[video_path] = VideoComparisonObject(
                 file_path=video_path,
-                hashed_imgs=hashed_imgs
+                hashed_imgs=rep_hashed.get(rep, [])
             )
 
-    finally:
-        temp_dir.cleanup()
+        # Remember the fresh hashes for the next run
+        metadata_cache.put_hashes_many(
+            (p, [h.hash_int for h in hashed])
+            for p, hashed in rep_hashed.items() if p not in cached_rep_paths
+        )
+        metadata_cache.close()
 
-    # Process video comparisons
-    counter = SafeCounter()
-    video_comparison_list = list(video_comparison_objects.values())
-    grouped_videos = mark_groups(video_comparison_list, counter)
-    
-    # Filter out ungrouped videos (group_number = 0)
-    filtered_videos = [v for v in grouped_videos if v.group_number > 0]
-    
-    # Sort the filtered videos
-    sorted_videos = sort_videos(filtered_videos)
+        # Process video comparisons
+        counter = SafeCounter()
+        video_comparison_list = list(video_comparison_objects.values())
+        grouped_videos = mark_groups(video_comparison_list, counter)
+        
+        # Filter out ungrouped videos (group_number = 0)
+        filtered_videos = [v for v in grouped_videos if v.group_number > 0]
+        
+        # Sort the filtered videos
+        sorted_videos = sort_videos(filtered_videos)
 
-    # Group videos by group_number
-    grouped_videos = {}
-    for video in sorted_videos:
-        if video.group_number not in grouped_videos:
-            grouped_videos[video.group_number] = []
-        grouped_videos[video.group_number].append(video.file_path)
+        # Group videos by group_number
+        grouped_videos = {}
+        for video in sorted_videos:
+            if video.group_number not in grouped_videos:
+                grouped_videos[video.group_number] = []
+            grouped_videos[video.group_number].append(video.file_path)
 
-    print(f"\nTotal Groups: {len(grouped_videos.keys())}")
+        print(f"\nTotal Groups: {len(grouped_videos.keys())}")
 
-    # Sort each group's videos naturally
-    for group in grouped_videos:
-        grouped_videos[group] = sort_path_naturally(grouped_videos[group])
+        # Sort each group's videos naturally
+        for group in grouped_videos:
+            grouped_videos[group] = sort_path_naturally(grouped_videos[group])
 
-    # Create wxPython app
-    app = wx.App(False)
-    # Show each group in wxPython window
-    total_groups = len(grouped_videos.keys())
-    for group_num in sorted(grouped_videos.keys()):
-        if grouped_videos[group_num]:
-            GroupWindow(
+        # Analyze per-group property differences up front
+        all_diffs = compute_all_diffs(grouped_videos, video_objects)
+
+        # Show each group in a wxPython window, one MainLoop for the whole
+        # session: closing a group opens the next, and thumbnails are only
+        # decoded for the groups actually opened.
+        group_nums = [g for g in sorted(grouped_videos.keys()) if grouped_videos[g]]
+        total_groups = len(grouped_videos.keys())
+
+        def show_group(index):
+            if index >= len(group_nums):
+                return  # last window closed, the main loop winds down
+            group_num = group_nums[index]
+            generate_group_thumbs(grouped_videos[group_num], video_objects, video_thumbs, temp_dir)
+            window = GroupWindow(
                 group_num,
                 grouped_videos[group_num],
                 video_objects,
                 video_thumbs,
                 total_groups,
-                args.fast_mode
+                args.fast_mode,
+                all_diffs[group_num]
             )
-            app.MainLoop()  # Process events until window closes
+
+            def on_close(event):
+                # Release this group's bitmaps and open the next window
+                # before this one is destroyed, so the app always has a
+                # live top-level window until the last group
+                for video_path in grouped_videos[group_num]:
+                    video_thumbs.pop(video_path, None)
+                show_group(index + 1)
+                event.Skip()
+
+            window.Bind(wx.EVT_CLOSE, on_close)
+
+        if group_nums:
+            show_group(0)
+            app.MainLoop()
+
+    finally:
+        temp_dir.cleanup()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,18 +1,25 @@
 '''Command line interface for video file scanning'''
 
 import argparse
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from utils.files import scan, sort_path_naturally
-from utils.ffprobe import get_video_info
-from utils.ffmpeg import screenshot
+from utils.ffprobe import get_video_info_batch
+from utils.ffmpeg import screenshot_multi
 from utils.helpers import seconds_to_str, generate_random_string
 from utils.images import HashableImage, HashComputer, create_thumb
 from utils.video_compare import VideoComparisonObject, mark_groups, sort_videos
 from utils.video_object import VideoObject
 from utils.safe_counter import SafeCounter
+from utils.metadata_cache import MetadataCache
+
+# Screenshots leave ffmpeg at this width: plenty for the 100 px thumbs
+# and the 8x8 hash, at a fraction of a full frame's decode cost
+SCREENSHOT_WIDTH = 200
 
 def main():
     parser = argparse.ArgumentParser(description='Scan for video files')
@@ -65,14 +72,37 @@ def main():
 
     # Image Hash related
     _computer = HashComputer('ahash')
-    
+
+    # On-disk metadata cache: unchanged files skip ffprobe on a rescan
+    metadata_cache = MetadataCache()
+    video_infos = {}
+    to_probe = []
+    for video_path in video_files:
+        info = metadata_cache.get(video_path)
+        if info is not None:
+            video_infos[video_path] = info
+        else:
+            to_probe.append(video_path)
+
+    # Probe the cache misses in one shared pool
+    probed, probe_errors = get_video_info_batch(to_probe)
+    video_infos.update(probed)
+    for video_path, e in probe_errors.items():
+        print(f"Error probing video {video_path}: {e}")
+
+    # Remember the fresh results for the next run
+    metadata_cache.put_many(probed.items())
+
     try:
-        for video_path in video_files:
+        # Build VideoObjects and the per-video screenshot jobs; videos whose
+        # screenshot hashes are cached skip ffmpeg entirely
+        cached_hashed = {}
+        screenshot_jobs = []  # (video_path, timestamps, output_pattern)
+        for video_path, info in video_infos.items():
             # Generate unique random string for this video
             rand_str = generate_random_string()
-            
-            # Get video info
-            width, height, duration, size, fps, codec = get_video_info(str(video_path))
+
+            width, height, duration, size, fps, codec = info
             duration = int(duration)
             
             # Create VideoObject
@@ -86,40 +116,88 @@ def main():
                 fps=fps,
                 codec=codec
             )
-            
-            # Take screenshots at key timestamps
-            timestamps = [5, 60, 120]
-            for sec in timestamps:
-                if sec <= duration:  # Only if video is long enough
-                    timestamp_str = seconds_to_str(sec)
-                    screenshot_path = Path(temp_dir.name) / f"{video_path.stem}_{rand_str}_{sec}s.jpg"
-                    screenshot(str(video_path), str(screenshot_path), timestamp_str)
-                    
-                    _img_obj = create_thumb(screenshot_path)
-                    if not video_thumbs.get(video_path, None):
-                        video_thumbs[video_path] = []
-                    if _img_obj:
-                        video_thumbs[video_path].append(_img_obj)
-
-                    video_obj.screenshots.append(screenshot_path)
-            
             video_objects[video_path] = video_obj
-            
-            # Create VideoComparisonObject with hashed screenshots
-            hashed_imgs = []
-            for screenshot_path in video_obj.screenshots:
+
+            cached = metadata_cache.get_hashes(video_path)
+            if cached is not None:
+                cached_hashed[video_path] = [
+                    HashableImage.from_cached(video_path, h) for h in cached]
+                continue
+
+            # Screenshots at key timestamps, if the video is long enough
+            timestamps = [sec for sec in (5, 60, 120) if sec <= duration]
+            if timestamps:
+                output_pattern = str(Path(temp_dir.name) / f"{video_path.stem.replace('%', '%%')}_{rand_str}_%d.jpg")
+                screenshot_jobs.append((video_path, timestamps, output_pattern))
+
+        # One ffmpeg invocation per video grabs all of its frames; the pool
+        # overlaps the subprocess waits across videos.
+        shots = {}
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {
+                executor.submit(screenshot_multi, str(p), pattern, secs, SCREENSHOT_WIDTH): p
+                for p, secs, pattern in screenshot_jobs
+            }
+            for future in as_completed(futures):
+                video_path = futures[future]
                 try:
-                    hashed_img = HashableImage(Path(screenshot_path), _computer)
-                    hashed_imgs.append(hashed_img)
+                    shots[video_path] = future.result()
                 except Exception as e:
-                    print(f"Error processing screenshot {screenshot_path}: {e}")
+                    print(f"Error taking screenshots of {video_path}: {e}")
+
+        # Thumbnails, in timestamp order per video
+        for video_path, secs, pattern in screenshot_jobs:
+            for screenshot_path in shots.get(video_path, []):
+                if not screenshot_path.exists():
+                    continue
+
+                _img_obj = create_thumb(screenshot_path)
+                if not video_thumbs.get(video_path, None):
+                    video_thumbs[video_path] = []
+                if _img_obj:
+                    video_thumbs[video_path].append(_img_obj)
+
+                video_objects[video_path].screenshots.append(screenshot_path)
+
+        # Hash all fresh screenshots on one pool (PIL decode and the hash
+        # kernels release the GIL), keeping per-video order via map()
+        def _hash_one(screenshot_path):
+            try:
+                return HashableImage(Path(screenshot_path), _computer)
+            except Exception as e:
+                print(f"Error processing screenshot {screenshot_path}: {e}")
+                return None
+
+        hash_jobs = []  # (video_path, screenshot_path)
+        for video_path, video_obj in video_objects.items():
+            if video_path not in cached_hashed:
+                hash_jobs.extend((video_path, p) for p in video_obj.screenshots)
+
+        hashed_by_video = {}
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for (video_path, _), hashed_img in zip(
+                    hash_jobs, executor.map(lambda job: _hash_one(job[1]), hash_jobs)):
+                if hashed_img:
+                    hashed_by_video.setdefault(video_path, []).append(hashed_img)
+
+        # Create VideoComparisonObjects, reusing cached hashes where available
+        fresh_hashes = []
+        for video_path in video_objects:
+            if video_path in cached_hashed:
+                hashed_imgs = cached_hashed[video_path]
+            else:
+                hashed_imgs = hashed_by_video.get(video_path, [])
+                fresh_hashes.append((video_path, [h.hash_int for h in hashed_imgs]))
             
             video_comparison_objects[video_path] = VideoComparisonObject(
                 file_path=video_path,
                 hashed_imgs=hashed_imgs
             )
 
-         
+        # Remember the fresh hashes for the next run
+        metadata_cache.put_hashes_many(fresh_hashes)
+        metadata_cache.close()
+
     finally:
         temp_dir.cleanup()
 
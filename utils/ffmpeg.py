@@ -1,17 +1,69 @@
 ''' ffmpeg command related functions '''
 import subprocess
+from pathlib import Path
+from typing import List
 
-def screenshot(v_file:str, output_jpg_path:str, timestamp="01:00"):
-    ''' Take one screenshot at specific timestamp as jpg'''
+def screenshot(v_file:str, output_jpg_path:str, timestamp="01:00", width:int=None):
+    ''' Take one screenshot at specific timestamp as jpg.
+
+        When width is given the frame is scaled down to that width (keeping
+        aspect) inside ffmpeg, so no full-size JPEG is written and re-decoded.
+    '''
+    vf = "scale=iw*sar:ih"  # Preserve aspect ratio
+    if width:
+        vf += f",scale={width}:-1"
     command = [
         "ffmpeg",
         "-hide_banner",
+        "-nostdin",
         "-loglevel", "error",
         "-ss", timestamp,
         "-i", v_file,
-        "-vf", "scale=iw*sar:ih",  # Preserve aspect ratio
+        "-vf", vf,
         "-vframes", "1",
         "-q:v", "3",
         output_jpg_path
     ]
     subprocess.run(command, check=True)
+
+
+def screenshot_multi(v_file:str, output_pattern:str, timestamps:List[int], width:int=None) -> List[Path]:
+    ''' Take screenshots at several timestamps (seconds) with one ffmpeg run.
+
+        output_pattern must contain a %d placeholder and any literal
+        percent signs escaped as %% (both ffmpeg's image2 muxer and the
+        path formatting below treat % as a pattern escape); frame i
+        (1-based, in ascending timestamp order) is written there. Seeks to the earliest
+        timestamp first, then a select filter grabs the first frame at or
+        after each later offset in the same decode pass, so one process
+        replaces one-per-timestamp.
+
+        Returns the expected output paths in timestamp order; a path may not
+        exist if the video ran out before its timestamp.
+    '''
+    secs = sorted(timestamps)
+    base = secs[0]
+    offsets = [sec - base for sec in secs]  # t restarts at ~0 after the seek
+
+    terms = [f"isnan(prev_selected_t)*gte(t\\,{offsets[0]})"]
+    terms += [f"lt(prev_selected_t\\,{offset})*gte(t\\,{offset})" for offset in offsets[1:]]
+    vf = "select=" + "+".join(terms)
+    vf += ",scale=iw*sar:ih"  # Preserve aspect ratio
+    if width:
+        vf += f",scale={width}:-1"
+
+    command = [
+        "ffmpeg",
+        "-hide_banner",
+        "-nostdin",
+        "-loglevel", "error",
+        "-ss", str(base),
+        "-i", v_file,
+        "-vf", vf,
+        "-vsync", "vfr",
+        "-frames:v", str(len(secs)),
+        "-q:v", "3",
+        output_pattern
+    ]
+    subprocess.run(command, check=True)
+    return [Path(output_pattern % (i + 1)) for i in range(len(secs))]
@@ -2,7 +2,8 @@
 import os
 import subprocess
 import json
-from typing import Tuple, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Tuple, List
 
 def _process_fps(data_str) -> int:
     ''' Process the fps number into int '''
@@ -35,7 +36,8 @@ def get_video_info(file_path) -> Tuple[int, int, float, int, int, str]:
         height = data['streams'][0]['height']
         avg_frame_rate = _process_fps(data['streams'][0]['avg_frame_rate'])
         duration = float(data['format']['duration'])
-        file_size = os.path.getsize(file_path)
+        # ffprobe already reports format=size; no extra stat needed
+        file_size = int(data['format']['size'])
         codec_name = str(data['streams'][0]['codec_name']) # hevc, h264
 
         return width, height, duration, file_size, avg_frame_rate, codec_name
@@ -43,3 +45,26 @@ def get_video_info(file_path) -> Tuple[int, int, float, int, int, str]:
         raise Exception(f"Error processing video file: {e}")
     except (KeyError, json.JSONDecodeError) as e:
         raise Exception(f"Error parsing ffprobe output: {e}")
+
+def get_video_info_batch(file_paths: Iterable, max_workers: int = None) -> Tuple[Dict, Dict]:
+    ''' Probe many video files concurrently with one shared worker pool.
+
+        ffprobe has no multi-input mode, so each file still costs one
+        process; the pool amortizes that by overlapping the forks and
+        the subprocess waits across workers.
+
+        Returns (infos, errors):
+        infos: file_path -> get_video_info() tuple
+        errors: file_path -> the exception raised while probing it
+    '''
+    infos = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        futures = {executor.submit(get_video_info, str(p)): p for p in file_paths}
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                infos[file_path] = future.result()
+            except Exception as e:
+                errors[file_path] = e
+    return infos, errors
@@ -1,9 +1,13 @@
 ''' file system related functions (Windows, Mac, Linux) '''
 
+import hashlib
 import os
+import platform
 import re
+import subprocess
+from functools import lru_cache
 from pathlib import Path
-from typing import Set, Union, List
+from typing import Iterable, Iterator, Set, Union, List
 
 try:
     from send2trash import send2trash
@@ -11,7 +15,7 @@ try:
 except ImportError:
     TRASH_SUPPORTED = False
 
-IMAGE_FILE_SUFFIXES = [
+IMAGE_FILE_SUFFIXES = frozenset([
     '.jxl', # jpegxl
     '.jpeg',
     '.jpg',
@@ -25,9 +29,9 @@ IMAGE_FILE_SUFFIXES = [
     '.heif',
     '.heic',
     '.svg'
-]
+])
 
-VIDEO_FILE_SUFFIXES = [
+VIDEO_FILE_SUFFIXES = frozenset([
     '.asf',
     '.avi',
     '.flv',
@@ -44,7 +48,10 @@ VIDEO_FILE_SUFFIXES = [
     '.vob',
     '.webm',
     '.wmv'
-]
+])
+
+# Precompiled digit-run splitter for the natural-sort tokenizers
+_NUM_SPLIT = re.compile(r'(\d+)').split
 
 def atoi(text: str):
     ''' convert text to int, if failed then return text itself '''
@@ -56,27 +63,31 @@ def natural_keys(text: str):
         All the numbers will be turned to int.
         Text remains text。
     '''
-    return [atoi(c) for c in re.split(r'(\d+)', text)]
+    return [int(c) if c.isdigit() else c for c in _NUM_SPLIT(text)]
+
+@lru_cache(maxsize=4096)
+def natural_path_key(p: Path) -> tuple:
+    ''' Natural-sort key of a whole path, section by section, excluding suffix.
+
+        Cached: group display sorts overlapping path lists repeatedly, and
+        tokenizing each path with the regex only needs to happen once.
+    '''
+    # Chop path into sections by OS separator
+    sections = list(Path(p).parts)
+    if sections:
+        # For the last section (filename), remove suffix
+        filename = sections[-1]
+        stem = Path(filename).stem
+        sections[-1] = stem
+    # For each section, generate natural_keys()
+    keys = []
+    for section in sections:
+        keys.extend(natural_keys(section))
+    return tuple(keys)
 
 def sort_path_naturally(paths: List[Path]) -> List[Path]:
     ''' Return the paths with natural sorting by whole path, section by section, excluding suffix '''
-    aparted_paths = []
-    for p in paths:
-        # Chop path into sections by OS separator
-        sections = list(Path(p).parts)
-        if sections:
-            # For the last section (filename), remove suffix
-            filename = sections[-1]
-            stem = Path(filename).stem
-            sections[-1] = stem
-        # For each section, generate natural_keys()
-        keys = []
-        for section in sections:
-            keys.extend(natural_keys(section))
-        aparted_paths.append(keys)
-    to_be_sorted = list(zip(aparted_paths, paths))
-    sorted_list = sorted(to_be_sorted, key=lambda x: x[0])
-    return [x[1] for x in sorted_list]
+    return sorted(paths, key=natural_path_key)
 
 def silent_remove(path: Union[Path, str]) -> None:
     '''Remove a file silently without raising errors for permissions, not found, etc.
@@ -88,8 +99,8 @@ def silent_remove(path: Union[Path, str]) -> None:
         None in all cases
     '''
     try:
-        path = Path(path) if not isinstance(path, Path) else path
-        path.unlink()
+        # os.fspath accepts str and PathLike alike with no allocation
+        os.unlink(os.fspath(path))
     except (FileNotFoundError, PermissionError, OSError, IsADirectoryError):
         pass
 
@@ -113,69 +124,169 @@ def safe_remove(path: Union[Path, str], use_trash: bool = True) -> None:
         silent_remove(path)
 
 
-def _is_hidden(path: Path) -> bool:
-    '''Check if a file/folder is hidden (works on Windows, Linux, Mac)'''
+
+
+def quick_signature(path: Union[Path, str], chunk_size: int = 4096) -> Union[bytes, None]:
+    '''Cheap content signature: hash of the first and last chunk_size bytes.
+
+    Two files sharing size and signature are treated as byte-identical by
+    the prefilter; collisions would need same length, head and tail.
+
+    Returns the digest, or None if the file cannot be read.
+    '''
+    try:
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            head = f.read(chunk_size)
+            if size > chunk_size:
+                f.seek(max(size - chunk_size, 0))
+                tail = f.read(chunk_size)
+            else:
+                tail = b''
+        return hashlib.blake2b(head + tail, digest_size=16).digest()
+    except OSError:
+        return None
+
+
+def open_file_location(file_path: Union[Path, str]) -> None:
+    '''Open the file's folder in the system file explorer, focused on the file where supported.
+
+    Fire-and-forget: the explorer is launched via Popen without waiting,
+    so a GUI caller's main loop is never blocked on its startup.
+    '''
+    file_path = Path(file_path)
+    try:
+        if platform.system() == 'Darwin':  # macOS
+            subprocess.Popen(['open', '-R', str(file_path)], close_fds=True)
+        elif platform.system() == 'Windows':
+            subprocess.Popen(['explorer', '/select,', str(file_path)],
+                             close_fds=True,
+                             creationflags=subprocess.DETACHED_PROCESS)
+        else:  # Linux and others
+            subprocess.Popen(['xdg-open', str(file_path.parent)], close_fds=True)
+    except Exception as e:
+        print(f"Error opening file location: {e}")
+
+
+def _is_hidden(entry) -> bool:
+    '''Check if a file/folder is hidden (works on Windows, Linux, Mac).
+
+    Accepts a Path or an os.DirEntry; a DirEntry's stat is cached by
+    scandir, so the Windows attribute check costs no extra syscall.
+    '''
     if os.name == 'nt':  # Windows
         try:
-            return bool(os.stat(path).st_file_attributes & 2)  # FILE_ATTRIBUTE_HIDDEN
+            return bool(entry.stat().st_file_attributes & 2)  # FILE_ATTRIBUTE_HIDDEN
         except:
             return False
     else:  # Unix-like
-        return path.name.startswith('.')
+        return entry.name.startswith('.')
+
+def _is_readonly_folder(path: Union[Path, str]) -> bool:
+    '''Check if a folder is read-only.
 
-def _is_readonly_folder(path: Path) -> bool:
-    '''Check if a folder is read-only'''
+    A single access(2) call instead of the old create-then-delete probe,
+    which cost two write syscalls (plus journaling) per scanned directory.
+    '''
     try:
-        test_file = path / '.temp_test_file'
-        test_file.touch()
-        test_file.unlink()
-        return False
-    except (OSError, PermissionError):
+        return not os.access(path, os.W_OK)
+    except OSError:
         return True
 
-def scan(folder_path: Union[str, Path], ignore_hidden: bool = True, ignore_readonly_folder:bool = True, recursive: bool = True, ignore_partial_names: List[str] = [], target_suffixes: List[str] = VIDEO_FILE_SUFFIXES) -> Set[Path]:
+def iter_scan(folder_path: Union[str, Path], ignore_hidden: bool = True, ignore_readonly_folder:bool = True, recursive: bool = True, ignore_partial_names: List[str] = [], target_suffixes: Iterable[str] = VIDEO_FILE_SUFFIXES) -> Iterator[Path]:
     '''
-    Scan for files with specified suffixes in the specified folder.
-    
-    Args:
-        folder_path: Path to scan
-        ignore_hidden: Whether to ignore hidden files/folders
-        ignore_readonly_folder: Whether to ignore immediate child files of read-only folders (since we cannot delete them)
-        recursive: Whether to scan recursively
-        ignore_partial_names: List of partial names to filter out from results
-        target_suffixes: List of file suffixes to scan for (defaults to VIDEO_FILE_SUFFIXES)
-        
-    Returns:
-        Set of Path objects for found files
+    Lazily scan for files with specified suffixes in the specified folder,
+    yielding each match as it is found.
+
+    Takes the same arguments as scan(); useful for overlapping the
+    filesystem walk with downstream work (e.g. metadata probing).
     '''
     folder = Path(folder_path).resolve()
-    video_files = set()
-    
-    def _scan(current_folder: Path):
+
+    def _scan(current_folder: str):
+        # The walk stays on plain strings; Path objects are only built
+        # for the sparse set of matches actually yielded
+        # os.scandir hands back DirEntry objects whose type/stat info is
+        # cached from the directory read, so the filters below cost no
+        # extra syscalls on most platforms
         try:
-            for item in current_folder.iterdir():
-                if ignore_hidden and _is_hidden(item):
+            with os.scandir(current_folder) as entries:
+                entries = list(entries)
+        except (PermissionError, OSError):
+            return
+
+        # Probe the folder's writability at most once, on the first match
+        folder_readonly = None
+        subdirs = []
+
+        for entry in entries:
+            try:
+                if ignore_hidden and _is_hidden(entry):
+                    continue
+
+                # Like os.walk(followlinks=False): never recurse through
+                # directory symlinks, which can cycle forever
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        subdirs.append(entry)
+                    continue
+
+                # Cheap string reject first, so entries with foreign
+                # suffixes never pay a type check at all.
+                if os.path.splitext(entry.name)[1].lower() not in target_suffixes:
                     continue
 
                 # If current_folder is set to 'readonly',
                 # On Unix/Linux systems:
-                # if no execute permission (no x) on dir, child_file.is_file() will FAIL with PermissionError
+                # if no execute permission (no x) on dir, entry.is_file() will FAIL with PermissionError
                 # because: it needs execute permission on dir to access child file's metadata.
                 # (in other words, it needs execute perssion to access dir's contents)
                 # On Windows:
-                # child_file.is_file() will succeed.
-                if item.is_file() and item.suffix.lower() in target_suffixes:
-                    if ignore_readonly_folder and _is_readonly_folder(item.parent):
-                        continue
+                # entry.is_file() will succeed.
+                if entry.is_file():
+                    if ignore_readonly_folder:
+                        if folder_readonly is None:
+                            folder_readonly = _is_readonly_folder(current_folder)
+                        if folder_readonly:
+                            continue
                     # Skip if any partial name matches
-                    if ignore_partial_names and any(partial.lower() in str(item).lower() for partial in ignore_partial_names):
+                    if ignore_partial_names and any(partial.lower() in entry.path.lower() for partial in ignore_partial_names):
                         continue
-                    video_files.add(item)
-                
-                if item.is_dir() and recursive:
-                    _scan(item)
-        except (PermissionError, OSError):
-            pass
-            
-    _scan(folder)
-    return video_files
\ No newline at end of file
+                    yield Path(entry.path)
+            except (PermissionError, OSError):
+                continue
+
+        # Recurse in ascending inode order on Unix: approximates on-disk
+        # layout, so metadata reads go near-sequential on spinning disks.
+        # NTFS exposes no meaningful inode, so keep directory order there.
+        if os.name != 'nt':
+            subdirs.sort(key=lambda e: e.inode())
+        for entry in subdirs:
+            yield from _scan(entry.path)
+
+    yield from _scan(str(folder))
+
+
+def scan(folder_path: Union[str, Path], ignore_hidden: bool = True, ignore_readonly_folder:bool = True, recursive: bool = True, ignore_partial_names: List[str] = [], target_suffixes: Iterable[str] = VIDEO_FILE_SUFFIXES) -> Set[Path]:
+    '''
+    Scan for files with specified suffixes in the specified folder.
+
+    Args:
+        folder_path: Path to scan
+        ignore_hidden: Whether to ignore hidden files/folders
+        ignore_readonly_folder: Whether to ignore immediate child files of read-only folders (since we cannot delete them)
+        recursive: Whether to scan recursively
+        ignore_partial_names: List of partial names to filter out from results
+        target_suffixes: List of file suffixes to scan for (defaults to VIDEO_FILE_SUFFIXES)
+
+    Returns:
+        Set of Path objects for found files
+    '''
+    return set(iter_scan(
+        folder_path,
+        ignore_hidden=ignore_hidden,
+        ignore_readonly_folder=ignore_readonly_folder,
+        recursive=recursive,
+        ignore_partial_names=ignore_partial_names,
+        target_suffixes=target_suffixes
+    ))
\ No newline at end of file
@@ -1,6 +1,8 @@
 import random
 import string
+from functools import lru_cache
 
+@lru_cache(maxsize=4096)
 def seconds_to_str(total_seconds: int) -> str:
     ''' Convert time in seconds to HH:MM:SS format '''
     hours = int(total_seconds // 3600)
@@ -9,6 +11,7 @@ def seconds_to_str(total_seconds: int) -> str:
     time_formatted = "{:02}:{:02}:{:02}".format(hours, minutes, seconds)
     return time_formatted
 
+@lru_cache(maxsize=4096)
 def size_to_str(total_bytes: int) -> str:
     ''' Covert bytes into string representation of B/KB/MB/Gb/TB format'''
     one_kb = 1024
@@ -6,15 +6,61 @@
 '''
 from typing import Optional, List
 from pathlib import Path
-from .images import HashableImage, is_similar_img
+from collections import defaultdict
+import numpy
+from .images import HashableImage, is_similar_img, SIMILAR_THRESHOLD
 from .safe_counter import SafeCounter
 
 
+# Above this many images the dense distance matrix gets large (N^2 bytes);
+# switch to banded candidate buckets instead
+_DENSE_MATRIX_LIMIT = 8192
+
+
+def _popcount(values: numpy.ndarray) -> numpy.ndarray:
+    ''' Per-element bit count, with a fallback for NumPy < 2.0 '''
+    if hasattr(numpy, 'bitwise_count'):
+        return numpy.bitwise_count(values)
+    return numpy.unpackbits(values[..., None].view(numpy.uint8), axis=-1).sum(axis=-1)
+
+
+
+def _sparse_matches(hash_ints: List[int], valid: List[bool]) -> dict:
+    ''' Map each index to the sorted later indices within SIMILAR_THRESHOLD.
+
+        Splits every 64-bit hash into SIMILAR_THRESHOLD bands; by pigeonhole
+        two hashes closer than the threshold must agree on at least one
+        band, so only indices sharing a band value are distance-checked.
+        Exact (no missed pairs), and avoids the O(N^2) matrix.
+    '''
+    bands = SIMILAR_THRESHOLD
+    sizes = [64 // bands + (1 if i < 64 % bands else 0) for i in range(bands)]
+
+    buckets = defaultdict(list)
+    for idx, h in enumerate(hash_ints):
+        if not valid[idx]:
+            continue
+        shift = 0
+        for band, size in enumerate(sizes):
+            buckets[(band, (h >> shift) & ((1 << size) - 1))].append(idx)
+            shift += size
+
+    matches = defaultdict(set)
+    for bucket in buckets.values():
+        for i, idx in enumerate(bucket):
+            for idx2 in bucket[i+1:]:
+                if (hash_ints[idx] ^ hash_ints[idx2]).bit_count() < SIMILAR_THRESHOLD:
+                    matches[idx].add(idx2)
+    return {idx: sorted(later) for idx, later in matches.items()}
+
+
 class ImageComparisonObject:
     ''' Represents an Image Comparison Object,
     
         Unique key is its file_path.
     '''
+    __slots__ = ('file_path', 'hashed_img', 'group_number')
+
     def __init__(self, file_path: Path, hashed_img: Optional[HashableImage] = None):
         self.file_path = file_path
         self.hashed_img = hashed_img
@@ -32,6 +78,31 @@ def mark_groups(a: List[ImageComparisonObject], counter: SafeCounter) -> List[Im
     ''' Run through the list.
         Find the identical images and mark the group number on the image (>0).
     '''
+    if len(a) < 2:
+        return a
+
+    if len(a) <= _DENSE_MATRIX_LIMIT:
+        # All pairwise Hamming distances in one vectorized XOR + popcount;
+        # the grouping walk below is unchanged, it just reads the matrix
+        hash_ints = numpy.array(
+            [item.hashed_img.hash_int if item.hashed_img else 0 for item in a],
+            dtype=numpy.uint64
+        )
+        valid = numpy.array([item.hashed_img is not None for item in a], dtype=bool)
+        distances = _popcount(hash_ints[:, None] ^ hash_ints[None, :])
+        similar = (distances < SIMILAR_THRESHOLD) & valid[:, None] & valid[None, :]
+
+        def _later_matches(idx):
+            return (idx + 1 + int(offset) for offset in numpy.nonzero(similar[idx, idx+1:])[0])
+    else:
+        # Large corpus: banded buckets give the same pairs without the matrix
+        hash_ints = [item.hashed_img.hash_int if item.hashed_img else 0 for item in a]
+        valid = [item.hashed_img is not None for item in a]
+        matches = _sparse_matches(hash_ints, valid)
+
+        def _later_matches(idx):
+            return matches.get(idx, ())
+
     for idx, item in enumerate(a):
         if idx == len(a) - 1:
             break
@@ -39,17 +110,17 @@ def mark_groups(a: List[ImageComparisonObject], counter: SafeCounter) -> List[Im
         if item.group_number > 0: # skip already grouped image
             continue
 
-        for idx2, item2 in enumerate(a[idx+1:]):
+        for idx2 in _later_matches(idx):
+            item2 = a[idx2]
             if item2.group_number > 0: # skip already grouped image
                 continue
 
-            if visual_compare_image(item, item2):
-                if item.group_number == 0:
-                    group_number = counter.get_int()
-                    item.group_number = group_number
-                    item2.group_number = group_number
-                else:
-                    item2.group_number = item.group_number
+            if item.group_number == 0:
+                group_number = counter.get_int()
+                item.group_number = group_number
+                item2.group_number = group_number
+            else:
+                item2.group_number = item.group_number
     
     return a
 
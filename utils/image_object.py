@@ -4,7 +4,10 @@ from pathlib import Path
 
 class ImageObject:
     '''Represents an image file with metadata and single screenshot'''
-    
+
+    # One instance per scanned image; skip the per-instance __dict__
+    __slots__ = ('file_path', 'width', 'height', 'size')
+
     def __init__(
         self,
         file_path: Path,
@@ -1,8 +1,11 @@
 ''' image load/manipulation/compare functions '''
-from typing import Union
+from functools import lru_cache
+from typing import List, Union
 from pathlib import Path
 from PIL import Image as PILImage
+from PIL import ImageDraw
 import imagehash
+import numpy
 
 # HASH_SIZE = 64
 # IDENTICAL_THRESHOLD = 6 # nearly identical in 64 bits
@@ -55,17 +58,56 @@ class HashComputer:
         return self.mode(img)
 
 
+def _pack_hash(img_hash: imagehash.ImageHash) -> int:
+    ''' Pack an ImageHash bit matrix into a single integer '''
+    value = 0
+    for bit in img_hash.hash.flatten():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def _unpack_hash(value: int, hash_size: int = HASH_SIZE) -> imagehash.ImageHash:
+    ''' Rebuild an ImageHash bit matrix from its packed integer '''
+    total = hash_size * hash_size
+    bits = [(value >> (total - 1 - i)) & 1 for i in range(total)]
+    return imagehash.ImageHash(numpy.array(bits, dtype=bool).reshape(hash_size, hash_size))
+
+
 class HashableImage:
     ''' Container of {Path, ImageHash} '''
+
+    # Up to three instances per scanned video and one per image;
+    # skip the per-instance __dict__
+    __slots__ = ('path', 'computer', 'img_hash', 'hash_int')
+
     def __init__(self, path: Path, computer: HashComputer):
         self.path = path
         self.computer = computer
         try:
             with PILImage.open(path) as img: # optimize, make the image short lived.
+                # ahash/phash only look at a tiny grayscale version; let the
+                # JPEG decoder skip detail beyond what the hash will keep
+                img.draft('L', (HASH_SIZE * 4, HASH_SIZE * 4))
                 self.img_hash = computer.compute(img)
+            self.hash_int = _pack_hash(self.img_hash)
         except Exception as e:
             raise Exception(f'Error in hashing image: {str(path)}')
 
+    @classmethod
+    def from_cached(cls, path: Path, hash_int: int):
+        '''Create HashableImage from a previously stored packed hash
+
+        Args:
+            path: path to the image file
+            hash_int: packed hash as produced by a prior run
+        '''
+        instance = cls.__new__(cls)
+        instance.path = path
+        instance.computer = None
+        instance.img_hash = _unpack_hash(hash_int)
+        instance.hash_int = hash_int
+        return instance
+
     @classmethod
     def from_pil_image(cls, path: Path, img: PILImage.Image, computer: HashComputer):
         '''Create HashableImage from existing PIL Image
@@ -79,6 +121,7 @@ class HashableImage:
         instance.path = path
         instance.computer = computer
         instance.img_hash = computer.compute(img)
+        instance.hash_int = _pack_hash(instance.img_hash)
         return instance
 
     def get_hash(self):
@@ -90,11 +133,13 @@ class HashableImage:
 
 def is_similar_img(a: HashableImage, b: HashableImage) -> bool:
     ''' Decide if images are similar '''
-    return abs(a.get_hash() - b.get_hash()) < SIMILAR_THRESHOLD
+    # XOR + popcount on the packed ints: same Hamming distance as
+    # subtracting the ImageHash objects, without the array round-trip
+    return (a.hash_int ^ b.hash_int).bit_count() < SIMILAR_THRESHOLD
 
 def is_identical_img(a: HashableImage, b: HashableImage) -> bool:
     ''' Decide if images are identical '''
-    return abs(a.get_hash() - b.get_hash()) < IDENTICAL_THRESHOLD
+    return (a.hash_int ^ b.hash_int).bit_count() < IDENTICAL_THRESHOLD
 
 def create_thumb(p: Path, dimension: int = 100) -> Union[None, PILImage.Image]:
     '''Read and resize an image to thumbnail with specified width.
@@ -108,21 +153,105 @@ def create_thumb(p: Path, dimension: int = 100) -> Union[None, PILImage.Image]:
     '''
     try:
         img = PILImage.open(p)
+        # For JPEGs, let the decoder skip detail beyond ~2x the target size
+        # (no-op for other formats)
+        img.draft('RGB', (dimension * 2, dimension * 2))
         if img.mode not in ("L", "RGB"):
             img = img.convert("RGB")
         
-        width, height = img.size
-        
-        if width > dimension:
-            # Calculate new height preserving aspect ratio
-            ratio = dimension / width
-            new_height = int(height * ratio)
-            img = img.resize((dimension, new_height))
-        
+        if img.width > dimension:
+            # In-place thumbnail, capping width only (the height bound can
+            # never bind since aspect ratio is preserved)
+            img.thumbnail((dimension, img.height), PILImage.Resampling.BILINEAR)
+
         return img
     except Exception:
         return None
 
+@lru_cache(maxsize=8)
+def create_nil_thumb(dimension: int = 100) -> PILImage.Image:
+    '''Create a grey "No Image" placeholder thumbnail.
+
+    Cached per dimension, so every placeholder slot shares one image
+    instead of re-drawing a fresh one per item.
+
+    Args:
+        dimension: Width of placeholder (height is 3/4 of width)
+
+    Returns:
+        PIL.Image placeholder
+    '''
+    img = PILImage.new('RGB', (dimension, dimension * 3 // 4), (200, 200, 200))
+    draw = ImageDraw.Draw(img)
+    draw.text((dimension // 5, dimension // 4), 'No Image', fill=(90, 90, 90))
+    return img
+
+def stitch_thumbs(images: List[PILImage.Image], limit: int = 3) -> Union[PILImage.Image, None]:
+    '''Paste up to limit thumbnails side by side into one RGB strip.
+
+    A row showing one strip needs a single bitmap and a single paint
+    call instead of one per thumbnail.
+
+    Args:
+        images: Thumbnails in display order
+        limit: Maximum number of thumbnails in the strip
+
+    Returns:
+        PIL.Image strip, or None when images is empty
+    '''
+    images = [img if img.mode == 'RGB' else img.convert('RGB') for img in images[:limit]]
+    if not images:
+        return None
+    strip = PILImage.new('RGB', (sum(img.width for img in images), max(img.height for img in images)))
+    x = 0
+    for img in images:
+        strip.paste(img, (x, 0))
+        x += img.width
+    return strip
+
+def open_info_thumb_hash(p: Path, computer: HashComputer, dimension: int = 100):
+    '''Open an image once and produce its info, thumbnail and hash in one pass.
+
+    Replaces the get_image_info + create_thumb + from_pil_image sequence,
+    which opened (and for JPEGs decoded) the same file up to three times.
+
+    Args:
+        p: Path to the image file
+        computer: HashComputer instance
+        dimension: Maximum thumbnail width (height scales proportionally)
+
+    Returns:
+        (info, thumb, hashed) where info matches get_image_info's dict;
+        later elements are None from the first failing step on.
+    '''
+    try:
+        img = PILImage.open(p)
+        width, height = img.size
+        file_size = p.stat().st_size
+    except Exception:
+        return None, None, None
+    info = {
+        'width': width,
+        'height': height,
+        'file_size': file_size
+    }
+
+    try:
+        # For JPEGs, let the decoder skip detail beyond ~2x the target size
+        img.draft('RGB', (dimension * 2, dimension * 2))
+        if img.mode not in ("L", "RGB"):
+            img = img.convert("RGB")
+        if img.width > dimension:
+            img.thumbnail((dimension, img.height), PILImage.Resampling.BILINEAR)
+    except Exception:
+        return info, None, None
+
+    try:
+        hashed = HashableImage.from_pil_image(p, img, computer)
+    except Exception:
+        return info, img, None
+    return info, img, hashed
+
 def get_image_info(p: Path) -> Union[dict[str, int], None]:
     '''Get detailed information about an image file
     
@@ -0,0 +1,132 @@
+''' Persistent cache of video metadata, so rescans skip ffprobe on unchanged files '''
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+# Default location follows the usual per-user cache convention
+DEFAULT_DB_PATH = Path.home() / '.cache' / 'video-dup-finder' / 'meta.db'
+
+
+class MetadataCache:
+    ''' SQLite-backed cache of get_video_info() results.
+
+        A cached row is keyed by absolute path and is only considered
+        valid while the file's mtime and size are unchanged; otherwise
+        the entry is treated as a miss and overwritten on the next put.
+    '''
+
+    def __init__(self, db_path: Union[Path, str] = DEFAULT_DB_PATH):
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Stat taken by get() per miss, reused by put_many: entries must be
+        # keyed by the file state at probe time, not at insert time
+        self._miss_stats = {}
+        self._hash_miss_stats = {}
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS video_meta ('
+            'path TEXT PRIMARY KEY, '
+            'mtime_ns INTEGER, '
+            'size INTEGER, '
+            'width INTEGER, '
+            'height INTEGER, '
+            'duration REAL, '
+            'fps INTEGER, '
+            'codec TEXT)'
+        )
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS video_hashes ('
+            'path TEXT PRIMARY KEY, '
+            'mtime_ns INTEGER, '
+            'size INTEGER, '
+            'hashes TEXT)'
+        )
+        self.conn.commit()
+
+    def get(self, file_path: Union[Path, str]) -> Optional[Tuple[int, int, float, int, int, str]]:
+        ''' Return (width, height, duration, size, fps, codec) on a valid hit, else None '''
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        row = self.conn.execute(
+            'SELECT mtime_ns, size, width, height, duration, fps, codec '
+            'FROM video_meta WHERE path = ?',
+            (str(file_path),)
+        ).fetchone()
+        if row is not None:
+            mtime_ns, size, width, height, duration, fps, codec = row
+            if mtime_ns == stat.st_mtime_ns and size == stat.st_size:
+                return width, height, duration, size, fps, codec
+        self._miss_stats[str(file_path)] = (stat.st_mtime_ns, stat.st_size)
+        return None
+
+    def put_many(self, items: Iterable[Tuple[Union[Path, str], Tuple[int, int, float, int, int, str]]]) -> None:
+        ''' Batch-insert (file_path, info) pairs, where info is a get_video_info() tuple '''
+        rows = []
+        for file_path, (width, height, duration, size, fps, codec) in items:
+            stat = self._miss_stats.get(str(file_path))
+            if stat is None:
+                try:
+                    file_stat = os.stat(file_path)
+                except OSError:
+                    continue
+                stat = (file_stat.st_mtime_ns, file_stat.st_size)
+            mtime_ns, file_size = stat
+            rows.append((str(file_path), mtime_ns, file_size,
+                         width, height, duration, fps, codec))
+        if rows:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO video_meta VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self.conn.commit()
+
+    def get_hashes(self, file_path: Union[Path, str]) -> Optional[List[int]]:
+        ''' Return the stored screenshot hashes (packed ints) on a valid hit, else None '''
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        row = self.conn.execute(
+            'SELECT mtime_ns, size, hashes FROM video_hashes WHERE path = ?',
+            (str(file_path),)
+        ).fetchone()
+        if row is not None:
+            mtime_ns, size, hashes_text = row
+            if mtime_ns == stat.st_mtime_ns and size == stat.st_size:
+                return [int(h, 16) for h in hashes_text.split(',')]
+        self._hash_miss_stats[str(file_path)] = (stat.st_mtime_ns, stat.st_size)
+        return None
+
+    def put_hashes_many(self, items: Iterable[Tuple[Union[Path, str], List[int]]]) -> None:
+        ''' Batch-insert (file_path, hash_ints) pairs.
+
+            Empty lists are not stored: a video with no hashable frames is
+            retried on the next run rather than cached as frameless.
+        '''
+        rows = []
+        for file_path, hash_ints in items:
+            if not hash_ints:
+                continue
+            stat = self._hash_miss_stats.get(str(file_path))
+            if stat is None:
+                try:
+                    file_stat = os.stat(file_path)
+                except OSError:
+                    continue
+                stat = (file_stat.st_mtime_ns, file_stat.st_size)
+            mtime_ns, file_size = stat
+            rows.append((str(file_path), mtime_ns, file_size,
+                         ','.join(f'{h:x}' for h in hash_ints)))
+        if rows:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO video_hashes VALUES (?, ?, ?, ?)',
+                rows
+            )
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
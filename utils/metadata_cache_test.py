@@ -0,0 +1,93 @@
+'''Tests for metadata_cache.py module - pytest version'''
+from utils.metadata_cache import MetadataCache
+
+INFO = (1920, 1080, 63.5, 5, 25, 'h264')
+
+
+def test_miss_then_hit(tmp_path):
+    '''Test that a stored entry is returned while the file is unchanged'''
+    video = tmp_path / 'video1.mp4'
+    video.write_bytes(b'12345')
+
+    cache = MetadataCache(tmp_path / 'meta.db')
+    assert cache.get(video) is None
+
+    cache.put_many([(video, INFO)])
+    assert cache.get(video) == INFO
+    cache.close()
+
+
+def test_invalidated_on_change(tmp_path):
+    '''Test that changing the file invalidates its cached entry'''
+    video = tmp_path / 'video1.mp4'
+    video.write_bytes(b'12345')
+
+    cache = MetadataCache(tmp_path / 'meta.db')
+    cache.put_many([(video, INFO)])
+
+    video.write_bytes(b'1234567890')  # size change
+    assert cache.get(video) is None
+    cache.close()
+
+
+def test_missing_file_is_miss(tmp_path):
+    '''Test that a vanished file never hits the cache'''
+    video = tmp_path / 'video1.mp4'
+    video.write_bytes(b'12345')
+
+    cache = MetadataCache(tmp_path / 'meta.db')
+    cache.put_many([(video, INFO)])
+    video.unlink()
+    assert cache.get(video) is None
+    cache.close()
+
+
+def test_persists_across_connections(tmp_path):
+    '''Test that entries survive reopening the database'''
+    video = tmp_path / 'video1.mp4'
+    video.write_bytes(b'12345')
+
+    cache = MetadataCache(tmp_path / 'meta.db')
+    cache.put_many([(video, INFO)])
+    cache.close()
+
+    reopened = MetadataCache(tmp_path / 'meta.db')
+    assert reopened.get(video) == INFO
+    reopened.close()
+
+
+def test_hashes_miss_then_hit(tmp_path):
+    '''Test that stored screenshot hashes are returned while the file is unchanged'''
+    video = tmp_path / 'video1.mp4'
+    video.write_bytes(b'12345')
+
+    cache = MetadataCache(tmp_path / 'meta.db')
+    assert cache.get_hashes(video) is None
+
+    cache.put_hashes_many([(video, [0xDEADBEEF, 0x1, 0xFFFFFFFFFFFFFFFF])])
+    assert cache.get_hashes(video) == [0xDEADBEEF, 0x1, 0xFFFFFFFFFFFFFFFF]
+    cache.close()
+
+
+def test_hashes_invalidated_on_change(tmp_path):
+    '''Test that changing the file invalidates its cached hashes'''
+    video = tmp_path / 'video1.mp4'
+    video.write_bytes(b'12345')
+
+    cache = MetadataCache(tmp_path / 'meta.db')
+    cache.put_hashes_many([(video, [0x1, 0x2])])
+
+    video.write_bytes(b'1234567890')  # size change
+    assert cache.get_hashes(video) is None
+    cache.close()
+
+
+def test_empty_hash_list_not_stored(tmp_path):
+    '''Test that an empty hash list is never cached (retried next run)'''
+    video = tmp_path / 'video1.mp4'
+    video.write_bytes(b'12345')
+
+    cache = MetadataCache(tmp_path / 'meta.db')
+    cache.put_hashes_many([(video, [])])
+    assert cache.get_hashes(video) is None
+    cache.close()
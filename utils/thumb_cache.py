@@ -0,0 +1,109 @@
+''' Persistent cache of image thumbnails and hashes, so rescans skip PIL on unchanged files '''
+
+import io
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Optional, Tuple, Union
+from PIL import Image as PILImage
+
+# Default location follows the usual per-user cache convention
+DEFAULT_DB_PATH = Path.home() / '.cache' / 'video-dup-finder' / 'thumbs.db'
+
+
+class ThumbCache:
+    ''' SQLite-backed cache of the per-image scan products: dimensions,
+        packed image hash and the encoded thumbnail.
+
+        A cached row is keyed by absolute path plus hash mode and is only
+        considered valid while the file's mtime and size are unchanged.
+    '''
+
+    def __init__(self, db_path: Union[Path, str] = DEFAULT_DB_PATH, hash_mode: str = 'ahash'):
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.hash_mode = hash_mode
+        # Stat taken by get() per miss, reused by put_many: entries must be
+        # keyed by the file state at read time, not at insert time
+        self._miss_stats = {}
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS image_cache ('
+            'path TEXT, '
+            'hash_mode TEXT, '
+            'mtime_ns INTEGER, '
+            'size INTEGER, '
+            'width INTEGER, '
+            'height INTEGER, '
+            'hash_hex TEXT, '
+            'thumb BLOB, '
+            'PRIMARY KEY (path, hash_mode))'
+        )
+        self.conn.commit()
+
+    def get(self, file_path: Union[Path, str], decode_thumb: bool = True) -> Optional[dict]:
+        ''' Return {'width', 'height', 'size', 'hash_int', 'thumb'} on a valid hit, else None.
+
+            'thumb' is the decoded PIL image; 'hash_int' the packed image hash.
+            Callers that never display the thumbnail can pass
+            decode_thumb=False to skip the JPEG decode ('thumb' will be None).
+        '''
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        row = self.conn.execute(
+            'SELECT mtime_ns, size, width, height, hash_hex, thumb '
+            'FROM image_cache WHERE path = ? AND hash_mode = ?',
+            (str(file_path), self.hash_mode)
+        ).fetchone()
+        if row is not None:
+            mtime_ns, size, width, height, hash_hex, thumb_bytes = row
+            if mtime_ns == stat.st_mtime_ns and size == stat.st_size:
+                thumb = None
+                if decode_thumb:
+                    try:
+                        thumb = PILImage.open(io.BytesIO(thumb_bytes))
+                        thumb.load()
+                    except Exception:
+                        thumb = None
+                if thumb is not None or not decode_thumb:
+                    return {
+                        'width': width,
+                        'height': height,
+                        'size': size,
+                        'hash_int': int(hash_hex, 16),
+                        'thumb': thumb,
+                    }
+        self._miss_stats[str(file_path)] = (stat.st_mtime_ns, stat.st_size)
+        return None
+
+    def put_many(self, items: Iterable[Tuple[Union[Path, str], int, int, int, PILImage.Image]]) -> None:
+        ''' Batch-insert (file_path, width, height, hash_int, thumb) entries '''
+        rows = []
+        for file_path, width, height, hash_int, thumb in items:
+            stat = self._miss_stats.get(str(file_path))
+            if stat is None:
+                try:
+                    file_stat = os.stat(file_path)
+                except OSError:
+                    continue
+                stat = (file_stat.st_mtime_ns, file_stat.st_size)
+            mtime_ns, file_size = stat
+
+            buffer = io.BytesIO()
+            try:
+                thumb.save(buffer, format='JPEG', quality=85)
+            except Exception:
+                continue
+            rows.append((str(file_path), self.hash_mode, mtime_ns, file_size,
+                         width, height, f'{hash_int:x}', buffer.getvalue()))
+        if rows:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO image_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,83 @@
+'''Tests for thumb_cache.py module - pytest version'''
+import pytest
+from PIL import Image
+
+from utils.thumb_cache import ThumbCache
+
+HASH_INT = 0x00FF00FF00FF00FF
+
+
+@pytest.fixture
+def image_file(tmp_path):
+    """A small JPEG on disk plus a matching thumbnail"""
+    path = tmp_path / 'image1.jpg'
+    Image.new('RGB', (40, 30), (200, 40, 40)).save(path)
+    thumb = Image.new('RGB', (20, 15), (200, 40, 40))
+    return path, thumb
+
+
+def test_miss_then_hit(tmp_path, image_file):
+    '''Test that a stored entry is returned while the file is unchanged'''
+    path, thumb = image_file
+
+    cache = ThumbCache(tmp_path / 'thumbs.db')
+    assert cache.get(path) is None
+
+    cache.put_many([(path, 40, 30, HASH_INT, thumb)])
+    hit = cache.get(path)
+    assert hit is not None
+    assert (hit['width'], hit['height'], hit['hash_int']) == (40, 30, HASH_INT)
+    assert hit['size'] == path.stat().st_size
+    assert hit['thumb'].size == (20, 15)
+    cache.close()
+
+
+def test_skip_thumb_decode(tmp_path, image_file):
+    '''Test that decode_thumb=False still hits, without the PIL image'''
+    path, thumb = image_file
+
+    cache = ThumbCache(tmp_path / 'thumbs.db')
+    cache.put_many([(path, 40, 30, HASH_INT, thumb)])
+
+    hit = cache.get(path, decode_thumb=False)
+    assert hit is not None
+    assert hit['hash_int'] == HASH_INT
+    assert hit['thumb'] is None
+    cache.close()
+
+
+def test_invalidated_on_change(tmp_path, image_file):
+    '''Test that changing the file invalidates its cached entry'''
+    path, thumb = image_file
+
+    cache = ThumbCache(tmp_path / 'thumbs.db')
+    cache.put_many([(path, 40, 30, HASH_INT, thumb)])
+
+    Image.new('RGB', (80, 60), (40, 40, 200)).save(path)  # new content
+    assert cache.get(path) is None
+    cache.close()
+
+
+def test_missing_file_is_miss(tmp_path, image_file):
+    '''Test that a vanished file never hits the cache'''
+    path, thumb = image_file
+
+    cache = ThumbCache(tmp_path / 'thumbs.db')
+    cache.put_many([(path, 40, 30, HASH_INT, thumb)])
+    path.unlink()
+    assert cache.get(path) is None
+    cache.close()
+
+
+def test_persists_across_connections(tmp_path, image_file):
+    '''Test that entries survive reopening the database'''
+    path, thumb = image_file
+
+    cache = ThumbCache(tmp_path / 'thumbs.db')
+    cache.put_many([(path, 40, 30, HASH_INT, thumb)])
+    cache.close()
+
+    reopened = ThumbCache(tmp_path / 'thumbs.db')
+    hit = reopened.get(path)
+    assert hit is not None and hit['hash_int'] == HASH_INT
+    reopened.close()
@@ -6,15 +6,29 @@
 '''
 from typing import List
 from pathlib import Path
-from .images import HashableImage, is_similar_img
+import numpy
+from .images import HashableImage, is_similar_img, SIMILAR_THRESHOLD
 from .safe_counter import SafeCounter
 
+# Above this many videos the (N, N, shots) distance tensor gets large;
+# fall back to the plain pairwise loop
+_DENSE_MATRIX_LIMIT = 4096
+
+
+def _popcount(values: numpy.ndarray) -> numpy.ndarray:
+    ''' Per-element bit count, with a fallback for NumPy < 2.0 '''
+    if hasattr(numpy, 'bitwise_count'):
+        return numpy.bitwise_count(values)
+    return numpy.unpackbits(values[..., None].view(numpy.uint8), axis=-1).sum(axis=-1)
+
 
 class VideoComparisonObject:
     ''' Represents a Video Comparison Object,
 
         Unique key is its file_path.
     '''
+    __slots__ = ('file_path', 'hashed_imgs', 'group_number')
+
     def __init__(self, file_path: Path, hashed_imgs: List[HashableImage]):
         self.file_path = file_path
         self.hashed_imgs = hashed_imgs
@@ -37,6 +51,34 @@ def mark_groups(a: List[VideoComparisonObject], counter: SafeCounter) -> List[Vi
     ''' Run through the list.
         Find the identical videos and mark the group number on the video (>0).
     '''
+    if len(a) < 2:
+        return a
+
+    max_shots = max(len(item.hashed_imgs) for item in a)
+    if len(a) <= _DENSE_MATRIX_LIMIT and max_shots > 0:
+        # All pairwise screenshot distances in one vectorized XOR +
+        # popcount; the grouping walk below just reads the boolean matrix.
+        # Matches visual_compare_video: zip over the shorter screenshot
+        # list, every compared pair similar, and both lists non-empty.
+        lengths = numpy.array([len(item.hashed_imgs) for item in a])
+        packed = numpy.zeros((len(a), max_shots), dtype=numpy.uint64)
+        for i, item in enumerate(a):
+            for k, hashed in enumerate(item.hashed_imgs):
+                packed[i, k] = hashed.hash_int
+
+        distances = _popcount(packed[:, None, :] ^ packed[None, :, :])
+        close = distances < SIMILAR_THRESHOLD
+        pair_len = numpy.minimum(lengths[:, None], lengths[None, :])
+        in_range = numpy.arange(max_shots)[None, None, :] < pair_len[:, :, None]
+        similar = ~((~close) & in_range).any(-1) & (pair_len > 0)
+
+        def _later_matches(idx):
+            return (idx + 1 + int(offset) for offset in numpy.nonzero(similar[idx, idx+1:])[0])
+    else:
+        def _later_matches(idx):
+            return (idx2 for idx2 in range(idx + 1, len(a))
+                    if visual_compare_video(a[idx], a[idx2]))
+
     for idx, item in enumerate(a):
         if idx == len(a) - 1:
             break
@@ -44,17 +86,17 @@ def mark_groups(a: List[VideoComparisonObject], counter: SafeCounter) -> List[Vi
         if item.group_number > 0: # skip already grouped video
             continue
 
-        for idx2, item2 in enumerate(a[idx+1:]):
+        for idx2 in _later_matches(idx):
+            item2 = a[idx2]
             if item2.group_number > 0: # skip already grouped video
                 continue
 
-            if visual_compare_video(item, item2):
-                if item.group_number == 0:
-                    group_number = counter.get_int()
-                    item.group_number = group_number
-                    item2.group_number = group_number
-                else:
-                    item2.group_number = item.group_number
+            if item.group_number == 0:
+                group_number = counter.get_int()
+                item.group_number = group_number
+                item2.group_number = group_number
+            else:
+                item2.group_number = item.group_number
     
     return a
 
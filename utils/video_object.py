@@ -1,10 +1,17 @@
-from typing import List
+from typing import List, Tuple
 from pathlib import Path
 
+from .helpers import seconds_to_str, size_to_str
+
 
 class VideoObject:
     '''Represents a video file with metadata and screenshots'''
-    
+
+    # Slots: one instance per scanned video, so skip the per-instance
+    # __dict__ on large corpora
+    __slots__ = ('file_path', 'screenshots', 'width', 'height',
+                 'duration', 'size', 'fps', 'codec', '_display_labels')
+
     def __init__(
         self,
         file_path: Path,
@@ -23,4 +30,22 @@ class VideoObject:
         self.duration = duration
         self.size = size
         self.fps = fps
-        self.codec = codec
\ No newline at end of file
+        self.codec = codec
+        self._display_labels = None
+
+    @property
+    def display_labels(self) -> Tuple[str, str, str, str, str]:
+        ''' Formatted (resolution, duration, size, fps, codec) labels.
+
+            Built once per video; every display panel and the group
+            difference analysis reuse the same strings.
+        '''
+        if self._display_labels is None:
+            self._display_labels = (
+                f"{self.width}x{self.height}",
+                f"Duration: {seconds_to_str(self.duration)}",
+                f"Size: {size_to_str(self.size)}",
+                f"FPS: {self.fps}",
+                f"Codec: {self.codec}"
+            )
+        return self._display_labels